@@ -17,17 +17,20 @@ import random
 import threading
 import sqlite3
 import logging
-import hashlib
+import logging.handlers
+import atexit
 import uuid
 import pickle
-import traceback
 import subprocess
-from datetime import datetime, timedelta
+import queue
+import heapq
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Tuple, Any, Callable
 from urllib.parse import urlparse, parse_qs, quote
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from collections import defaultdict, deque, OrderedDict
-from functools import wraps
+from functools import wraps, lru_cache
 import re
 import base64
 
@@ -40,11 +43,12 @@ try:
     )
     from features import (
         AnalyticsEngine, NotificationManager, TaskScheduler,
-        PluginManager, UserPreferences, CommandRegistry
+        PluginManager, UserPreferences, CommandRegistry,
+        NOTIFICATION_SNAPSHOT_FILE, NOTIFICATION_SNAPSHOT_INTERVAL
     )
     from config import (
         BOT_TOKEN, BOT_NAME, BOT_VERSION, DATABASE_FILE, 
-        LOG_FILE, ADMIN_IDS, OWNER_ID, MIN_VIEW_TIME,
+        LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, ADMIN_IDS, OWNER_ID, MIN_VIEW_TIME,
         MAX_VIEW_TIME, DEFAULT_VIEW_TIME, MIN_VIEW_COUNT,
         MAX_VIEW_COUNT, DEFAULT_VIEW_COUNT, RATE_LIMIT_VISITS_PER_MINUTE,
         RATE_LIMIT_VISITS_PER_HOUR, RATE_LIMIT_VISITS_PER_DAY,
@@ -57,12 +61,13 @@ except ImportError as e:
     _import_error = str(e)
 
 # Third-party imports
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Telegram imports
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -82,6 +87,8 @@ if not MODULES_LOADED:
     BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
     DATABASE_FILE = "telegram_bot.db"
     LOG_FILE = "telegram_bot.log"
+    LOG_MAX_BYTES = 0
+    LOG_BACKUP_COUNT = 0
     ADMIN_IDS = []
     OWNER_ID = 0
     MIN_VIEW_TIME = 5
@@ -103,10 +110,86 @@ USERS_CACHE_FILE = "users_cache.json"
 STATS_FILE = "bot_stats.json"
 PROXY_VALIDATION_INTERVAL = 3600
 MAX_PROXY_FAILURES = 5
+MAX_FAILED_PROXIES = 10000
+FAILED_PROXY_TTL = 86400
+PROXY_RATE_LIMIT_PAUSE = 60
+MAX_PROXY_PAUSE = 3600
 MIN_PROXY_POOL_SIZE = 50
 THREAD_POOL_TIMEOUT = 45
 CACHE_EXPIRY = 3600
 MAX_CACHE_SIZE = 1000
+DB_POOL_SIZE = 5
+VIEW_CONCURRENCY = MAX_WORKERS * 8
+MIN_VIEW_CONCURRENCY = 4
+PROXY_VALIDATION_CONCURRENCY = 64
+RATE_LIMIT_FLUSH_INTERVAL = 30
+STATS_CACHE_TTL = 30
+USER_CACHE_SIZE = 4096
+USER_CACHE_TTL = 60
+USER_SESSION_MAX = 10000
+USER_SESSION_TTL = 600
+MAX_URL_LENGTH = 2048
+
+# ============================================================================
+# STANDALONE FALLBACKS
+# ============================================================================
+
+if not MODULES_LOADED:
+    class LRUCache:
+        """Dict-backed stand-in for utils.LRUCache when the bot modules are unavailable
+        
+        Limits: evicts the oldest insert rather than the least recently used
+        entry, drops expired entries only when read or evicted (no reaper),
+        and has no striping. Only get/set/pop are provided.
+        """
+        
+        def __init__(self, max_size: int = 1000, expiry_time: int = 3600):
+            """Initialize cache"""
+            self.max_size = max_size
+            self.expiry_time = expiry_time
+            # key -> (value, monotonic expiry)
+            self._entries: Dict[Any, Tuple[Any, float]] = {}
+            self._lock = threading.Lock()
+        
+        def get(self, key: Any) -> Optional[Any]:
+            """Get value from cache"""
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() > entry[1]:
+                return None
+            return entry[0]
+        
+        def set(self, key: Any, value: Any):
+            """Set value in cache"""
+            with self._lock:
+                self._entries.pop(key, None)
+                if len(self._entries) >= self.max_size:
+                    del self._entries[next(iter(self._entries))]
+                self._entries[key] = (value, time.monotonic() + self.expiry_time)
+        
+        def pop(self, key: Any, default: Any = None) -> Any:
+            """Remove a key and return its value, or default if missing or expired"""
+            with self._lock:
+                entry = self._entries.pop(key, None)
+            if entry is None or time.monotonic() > entry[1]:
+                return default
+            return entry[0]
+
+# Admin membership is checked on every admin command
+_ADMIN_IDS = frozenset(ADMIN_IDS)
+
+# YouTube video URL forms: watch?v=, youtu.be/, embed/ and v/
+_YT_URL_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?v=|embed/|v/)|youtu\.be/)([a-zA-Z0-9_-]{11})'
+)
+
+@lru_cache(maxsize=1024)
+def _parse_video_id(url: str) -> Optional[str]:
+    """Extract the video ID from a YouTube URL; a batch re-parses the same URL per view"""
+    # Cheap rejects before entering the regex engine
+    if len(url) > MAX_URL_LENGTH or 'youtu' not in url:
+        return None
+    match = _YT_URL_RE.search(url)
+    return match.group(1) if match else None
 
 # Conversation states
 WAITING_FOR_URL = 1
@@ -121,14 +204,29 @@ WAITING_FOR_PROXY_SOURCE = 5
 
 def setup_logging():
     """Configure comprehensive logging system"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - [%(funcName)s:%(lineno)d] - %(message)s',
-        handlers=[
-            logging.FileHandler(LOG_FILE),
-            logging.StreamHandler(sys.stdout)
-        ]
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - [%(funcName)s:%(lineno)d] - %(message)s'
     )
+    output_handlers = [
+        # With the default LOG_MAX_BYTES of 0 this never rolls over, like a plain FileHandler
+        logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in output_handlers:
+        handler.setFormatter(formatter)
+    
+    # Callers only enqueue records; a listener thread does the file and console I/O.
+    # Module loggers elsewhere (features, utils) propagate to this root handler.
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # The listener's handlers apply the real format; keep the queued message plain
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
     return logging.getLogger(__name__)
 
 logger = setup_logging()
@@ -143,6 +241,15 @@ else:
 # USER AGENT ROTATION SYSTEM
 # ============================================================================
 
+_thread_local = threading.local()
+
+def _rng() -> random.Random:
+    """Get this thread's random generator, seeded from os.urandom"""
+    rng = getattr(_thread_local, 'rng', None)
+    if rng is None:
+        rng = _thread_local.rng = random.Random(os.urandom(8))
+    return rng
+
 class UserAgentRotator:
     """Advanced user agent rotation to avoid detection"""
     
@@ -174,16 +281,50 @@ class UserAgentRotator:
         "Mozilla/5.0 (iPad; CPU OS 16_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.7 Mobile/15E148 Safari/604.1",
     ]
     
+    ACCEPT_LANGUAGES = (
+        "en-US,en;q=0.9",
+        "en-GB,en;q=0.8",
+        "de-DE,de;q=0.9",
+        "fr-FR,fr;q=0.9",
+        "es-ES,es;q=0.9",
+        "it-IT,it;q=0.9",
+        "ja-JP,ja;q=0.9",
+    )
+    
+    BASE_HEADERS = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": ACCEPT_LANGUAGES[0],
+        "Accept-Encoding": "gzip, deflate, br",
+        "DNT": "1",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "none",
+        "Cache-Control": "max-age=0",
+        "Pragma": "no-cache",
+    }
+    
     def __init__(self):
         """Initialize user agent rotator"""
         self.all_agents = self.DESKTOP_AGENTS + self.MOBILE_AGENTS + self.TABLET_AGENTS
         self.device_types = ["desktop", "mobile", "tablet"]
         self.last_agent = None
+        
+        # Fully-formed header templates, one per user agent
+        self._header_templates = {
+            device: tuple({"User-Agent": agent, **self.BASE_HEADERS} for agent in agents)
+            for device, agents in (
+                ("desktop", self.DESKTOP_AGENTS),
+                ("mobile", self.MOBILE_AGENTS),
+                ("tablet", self.TABLET_AGENTS),
+            )
+        }
     
     def get_random_agent(self, device_type: Optional[str] = None) -> Tuple[str, str]:
         """Get random user agent and device type"""
         if device_type is None:
-            device_type = random.choice(self.device_types)
+            device_type = _rng().choice(self.device_types)
         
         if device_type == "mobile":
             agents = self.MOBILE_AGENTS
@@ -192,37 +333,21 @@ class UserAgentRotator:
         else:
             agents = self.DESKTOP_AGENTS
         
-        agent = random.choice(agents)
+        agent = _rng().choice(agents)
         self.last_agent = agent
         return agent, device_type
     
     def get_headers(self, device_type: Optional[str] = None) -> Dict[str, str]:
         """Generate realistic headers with random user agent"""
-        agent, device = self.get_random_agent(device_type)
+        rng = _rng()
+        if device_type is None:
+            device_type = rng.choice(self.device_types)
         
-        headers = {
-            "User-Agent": agent,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": random.choice([
-                "en-US,en;q=0.9",
-                "en-GB,en;q=0.8",
-                "de-DE,de;q=0.9",
-                "fr-FR,fr;q=0.9",
-                "es-ES,es;q=0.9",
-                "it-IT,it;q=0.9",
-                "ja-JP,ja;q=0.9",
-            ]),
-            "Accept-Encoding": "gzip, deflate, br",
-            "DNT": "1",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-            "Sec-Fetch-Dest": "document",
-            "Sec-Fetch-Mode": "navigate",
-            "Sec-Fetch-Site": "none",
-            "Cache-Control": "max-age=0",
-            "Pragma": "no-cache",
-        }
+        templates = self._header_templates.get(device_type, self._header_templates["desktop"])
+        headers = rng.choice(templates).copy()
+        headers["Accept-Language"] = rng.choice(self.ACCEPT_LANGUAGES)
         
+        self.last_agent = headers["User-Agent"]
         return headers
 
 # ============================================================================
@@ -239,24 +364,40 @@ class ProxyManager:
         "https://raw.githubusercontent.com/clarketm/proxy-list/master/proxy-list-raw.txt",
     ]
     
+    PROXY_TEST_URLS = [
+        "http://httpbin.org/ip",
+        "http://api.ipify.org",
+        "http://icanhazip.com",
+    ]
+    
     def __init__(self):
         """Initialize proxy manager"""
-        self.proxies: List[Dict[str, Any]] = []
+        # self.proxies is replaced wholesale, never mutated in place, so
+        # readers can take a reference to it without holding a lock
+        self.proxies: Tuple[Dict[str, Any], ...] = ()
+        self.proxies_by_str: Dict[str, Dict[str, Any]] = {}
+        self._fail_heap: List[Tuple[int, str]] = []
+        # Rate-limited proxies sit out until their resume time
+        self.paused: Dict[str, float] = {}
+        self._pause_heap: List[Tuple[float, str]] = []
         self.lock = threading.Lock()
+        self.refresh_lock = threading.RLock()
         self.last_validation = 0
         self.validation_interval = PROXY_VALIDATION_INTERVAL
         self.user_agent_rotator = UserAgentRotator()
-        self.failed_proxies = set()
+        # Blacklisted proxies, capped and forgotten after FAILED_PROXY_TTL
+        self.failed_proxies = LRUCache(max_size=MAX_FAILED_PROXIES, expiry_time=FAILED_PROXY_TTL)
     
     def load_from_cache(self) -> bool:
         """Load proxies from cache file"""
         try:
             if os.path.exists(PROXY_CACHE_FILE):
-                with open(PROXY_CACHE_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.proxies = data.get('proxies', [])
-                    logger.info(f"Loaded {len(self.proxies)} proxies from cache")
-                    return len(self.proxies) > 0
+                with open(PROXY_CACHE_FILE, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
+                self._install_pool(data.get('proxies', []))
+                logger.info(f"Loaded {len(self.proxies)} proxies from cache")
+                return len(self.proxies) > 0
         except Exception as e:
             logger.error(f"Error loading proxy cache: {e}")
         return False
@@ -264,203 +405,390 @@ class ProxyManager:
     def save_to_cache(self):
         """Save proxies to cache file"""
         try:
-            with open(PROXY_CACHE_FILE, 'w') as f:
-                json.dump({
-                    'proxies': self.proxies,
-                    'timestamp': time.time(),
-                    'count': len(self.proxies)
-                }, f, indent=2)
-                logger.info(f"Saved {len(self.proxies)} proxies to cache")
+            data = {
+                'proxies': [
+                    {k: v for k, v in p.items() if k not in ('url', 'proxy_dict')}
+                    for p in self.proxies
+                ],
+                'timestamp': time.time(),
+                'count': len(self.proxies)
+            }
+            raw = orjson.dumps(data) if orjson else json.dumps(data).encode()
+            
+            # Write to a temp file and rename so readers never see a partial cache
+            tmp_file = f"{PROXY_CACHE_FILE}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_file, PROXY_CACHE_FILE)
+            logger.info(f"Saved {len(self.proxies)} proxies to cache")
         except Exception as e:
             logger.error(f"Error saving proxy cache: {e}")
     
-    def scrape_proxies(self) -> List[str]:
-        """Scrape proxies from multiple sources"""
-        proxies = []
+    async def _scrape_source_async(self, session: aiohttp.ClientSession, source: str) -> List[str]:
+        """Scrape proxies from a single source"""
+        try:
+            async with session.get(
+                source,
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers=self.user_agent_rotator.get_headers()
+            ) as response:
+                if response.status == 200:
+                    body = await response.read()
+                    
+                    # Split the raw bytes and decode only the lines we keep
+                    proxy_list = []
+                    for line in body.splitlines():
+                        line = line.strip()
+                        if line:
+                            proxy_list.append(line.decode('ascii', 'ignore'))
+                            if len(proxy_list) >= 30:
+                                break
+                    
+                    logger.info(f"Scraped {len(proxy_list)} proxies from {source}")
+                    return proxy_list
+        except Exception as e:
+            logger.warning(f"Error scraping from {source}: {e}")
         
-        for source in self.PROXY_SOURCES:
+        return []
+    
+    async def _scrape_proxies_async(self, session: aiohttp.ClientSession) -> List[str]:
+        """Scrape all proxy sources concurrently"""
+        results = await asyncio.gather(
+            *(self._scrape_source_async(session, source) for source in self.PROXY_SOURCES)
+        )
+        return [proxy for proxy_list in results for proxy in proxy_list]
+    
+    async def _probe_proxy_async(self, session: aiohttp.ClientSession, proxy: str, url: str) -> bool:
+        """Check whether a single test URL answers through the proxy"""
+        try:
+            async with session.get(
+                url,
+                proxy=f"http://{proxy}",
+                timeout=aiohttp.ClientTimeout(total=PROXY_TIMEOUT),
+                headers=self.user_agent_rotator.get_headers()
+            ) as response:
+                return response.status == 200
+        except Exception:
+            return False
+    
+    async def _validate_proxy_async(self, session: aiohttp.ClientSession, proxy: str,
+                                    semaphore: asyncio.Semaphore) -> bool:
+        """Validate a proxy against all test URLs at once, stopping at the first success"""
+        async with semaphore:
+            pending = {
+                asyncio.ensure_future(self._probe_proxy_async(session, proxy, url))
+                for url in self.PROXY_TEST_URLS
+            }
             try:
-                response = requests.get(
-                    source,
-                    timeout=10,
-                    headers=self.user_agent_rotator.get_headers()
-                )
-                if response.status_code == 200:
-                    proxy_list = response.text.strip().split('\r\n')
-                    proxies.extend(proxy_list[:30])
-                    logger.info(f"Scraped {len(proxy_list[:30])} proxies from {source}")
-            except Exception as e:
-                logger.warning(f"Error scraping from {source}: {e}")
-        
-        return proxies
-    
-    def validate_proxy(self, proxy: str) -> bool:
-        """Validate if proxy is working"""
-        test_urls = [
-            "http://httpbin.org/ip",
-            "http://api.ipify.org",
-            "http://icanhazip.com",
-        ]
-        
-        proxy_dict = {
-            "http": f"http://{proxy}",
-            "https": f"http://{proxy}"
-        }
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    if any(task.result() for task in done):
+                        return True
+                return False
+            finally:
+                for task in pending:
+                    task.cancel()
+    
+    async def _collect_valid_proxies(self) -> List[str]:
+        """Scrape and validate proxies with bounded concurrency"""
+        semaphore = asyncio.Semaphore(PROXY_VALIDATION_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=256, limit_per_host=64)
         
-        for url in test_urls:
-            try:
-                response = requests.get(
-                    url,
-                    proxies=proxy_dict,
-                    timeout=PROXY_TIMEOUT,
-                    headers=self.user_agent_rotator.get_headers()
-                )
-                if response.status_code == 200:
-                    return True
-            except Exception:
-                pass
+        async with aiohttp.ClientSession(connector=connector) as session:
+            scraped = await self._scrape_proxies_async(session)
+            candidates = [p for p in dict.fromkeys(scraped) if self.failed_proxies.get(p) is None]
+            results = await asyncio.gather(
+                *(self._validate_proxy_async(session, proxy, semaphore) for proxy in candidates)
+            )
         
-        return False
+        return [proxy for proxy, valid in zip(candidates, results) if valid][:PROXY_POOL_SIZE]
     
     def refresh_proxies(self) -> int:
         """Refresh proxy pool with validation"""
-        with self.lock:
+        with self.refresh_lock:
             logger.info("Refreshing proxy pool...")
             
-            new_proxies = self.scrape_proxies()
-            
-            valid_proxies = []
-            for proxy in new_proxies:
-                if proxy not in self.failed_proxies and self.validate_proxy(proxy):
-                    valid_proxies.append({
-                        'proxy': proxy,
-                        'success_count': 0,
-                        'fail_count': 0,
-                        'last_used': None,
-                        'added_at': time.time()
-                    })
-                    if len(valid_proxies) >= PROXY_POOL_SIZE:
-                        break
-            
-            self.proxies = valid_proxies
+            now = time.time()
+            valid_proxies = [
+                {
+                    'proxy': proxy,
+                    'success_count': 0,
+                    'fail_count': 0,
+                    'last_used': None,
+                    'added_at': now
+                }
+                for proxy in asyncio.run(self._collect_valid_proxies())
+            ]
+            
+            self._install_pool(valid_proxies)
+            self.last_validation = time.time()
             self.save_to_cache()
-            logger.info(f"Proxy pool refreshed: {len(self.proxies)} valid proxies")
+            logger.info(f"Proxy pool refreshed: {len(valid_proxies)} valid proxies")
             
-            return len(self.proxies)
+            return len(valid_proxies)
     
-    def get_random_proxy(self) -> Optional[Dict[str, Any]]:
-        """Get random proxy from pool"""
-        with self.lock:
-            if time.time() - self.last_validation > self.validation_interval:
+    def _refresh_if_stale(self):
+        """Refresh the pool unless another thread is already doing it"""
+        if not self.refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if self.is_stale():
                 self.refresh_proxies()
-                self.last_validation = time.time()
-            
-            if not self.proxies:
+        finally:
+            self.refresh_lock.release()
+    
+    def _install_pool(self, proxies: List[Dict[str, Any]]):
+        """Swap in a new proxy pool together with its index and heap"""
+        # Build the request-side proxy URL and mapping once, not per view
+        for p in proxies:
+            url = f"http://{p['proxy']}"
+            p['url'] = url
+            p['proxy_dict'] = {"http": url, "https": url}
+        
+        with self.lock:
+            self.proxies = tuple(proxies)
+            self._rebuild_index()
+    
+    def _rebuild_index(self):
+        """Rebuild the lookup index and fail-count heap from self.proxies"""
+        self.proxies_by_str = {p['proxy']: p for p in self.proxies}
+        self._fail_heap = [
+            (p['fail_count'], p['proxy']) for p in self.proxies if p['proxy'] not in self.paused
+        ]
+        heapq.heapify(self._fail_heap)
+    
+    def _push_fail_count(self, proxy: Dict[str, Any]):
+        """Record a proxy's new fail count; older heap entries become stale"""
+        heapq.heappush(self._fail_heap, (proxy['fail_count'], proxy['proxy']))
+        
+        # Compact once stale entries dominate the heap
+        if len(self._fail_heap) > 4 * len(self.proxies_by_str) + 16:
+            self._rebuild_index()
+    
+    def is_stale(self) -> bool:
+        """Check whether the pool is due for revalidation"""
+        return time.time() - self.last_validation > self.validation_interval
+    
+    def pause_proxy(self, proxy_str: str, seconds: float):
+        """Take a rate-limited proxy out of rotation without counting a failure"""
+        resume_at = time.monotonic() + min(seconds, MAX_PROXY_PAUSE)
+        with self.lock:
+            if proxy_str not in self.proxies_by_str:
+                return
+            self.paused[proxy_str] = resume_at
+            heapq.heappush(self._pause_heap, (resume_at, proxy_str))
+        logger.debug(f"Proxy {proxy_str} paused for {seconds:.0f}s")
+    
+    def _resume_paused(self):
+        """Return proxies whose pause has expired to the fail-count heap"""
+        now = time.monotonic()
+        while self._pause_heap and self._pause_heap[0][0] <= now:
+            resume_at, proxy_str = heapq.heappop(self._pause_heap)
+            # A later pause for the same proxy supersedes this entry
+            if self.paused.get(proxy_str) != resume_at:
+                continue
+            del self.paused[proxy_str]
+            proxy = self.proxies_by_str.get(proxy_str)
+            if proxy is not None:
+                self._push_fail_count(proxy)
+    
+    def get_random_proxy(self, refresh: bool = True) -> Optional[Dict[str, Any]]:
+        """Get random proxy from pool, refreshing a stale pool unless refresh is False"""
+        if refresh and self.is_stale():
+            self._refresh_if_stale()
+        
+        with self.lock:
+            if self._pause_heap:
+                self._resume_paused()
+            
+            # Discard stale and paused entries until the top is a live, usable proxy
+            while self._fail_heap:
+                fail_count, proxy_str = self._fail_heap[0]
+                proxy = self.proxies_by_str.get(proxy_str)
+                if (proxy is not None and proxy['fail_count'] == fail_count
+                        and proxy_str not in self.paused):
+                    break
+                heapq.heappop(self._fail_heap)
+            else:
                 return None
             
-            proxy = min(self.proxies, key=lambda p: p['fail_count'])
             proxy['last_used'] = time.time()
             return proxy.copy()
     
     def mark_success(self, proxy_str: str):
         """Mark proxy as successful"""
         with self.lock:
-            for proxy in self.proxies:
-                if proxy['proxy'] == proxy_str:
-                    proxy['success_count'] += 1
-                    proxy['fail_count'] = max(0, proxy['fail_count'] - 1)
+            proxy = self.proxies_by_str.get(proxy_str)
+            if proxy is None:
+                return
+            
+            proxy['success_count'] += 1
+            if proxy['fail_count'] > 0:
+                proxy['fail_count'] -= 1
+                self._push_fail_count(proxy)
     
     def mark_failure(self, proxy_str: str):
         """Mark proxy as failed"""
         with self.lock:
-            for proxy in self.proxies:
-                if proxy['proxy'] == proxy_str:
-                    proxy['fail_count'] += 1
-                    if proxy['fail_count'] >= MAX_PROXY_FAILURES:
-                        self.failed_proxies.add(proxy_str)
-                        logger.warning(f"Proxy {proxy_str} marked as permanently failed")
+            proxy = self.proxies_by_str.get(proxy_str)
+            if proxy is None:
+                return
+            
+            proxy['fail_count'] += 1
+            self._push_fail_count(proxy)
+            if proxy['fail_count'] >= MAX_PROXY_FAILURES:
+                self.failed_proxies.set(proxy_str, True)
+                logger.warning(f"Proxy {proxy_str} marked as permanently failed")
 
 # ============================================================================
 # DATABASE MANAGEMENT
 # ============================================================================
 
+_now_cache: Tuple[int, datetime] = (0, datetime.fromtimestamp(0))
+
+def _now() -> datetime:
+    """Current time at one-second granularity, reused within the second"""
+    global _now_cache
+    second = int(time.time())
+    if second != _now_cache[0]:
+        _now_cache = (second, datetime.fromtimestamp(second))
+    return _now_cache[1]
+
 class DatabaseManager:
     """Manages SQLite database for user data and statistics"""
     
-    def __init__(self, db_file: str = DATABASE_FILE):
+    def __init__(self, db_file: str = DATABASE_FILE, pool_size: int = DB_POOL_SIZE):
         """Initialize database manager"""
         self.db_file = db_file
         self.lock = threading.Lock()
+        self.pool: queue.Queue = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self.pool.put(self._create_connection())
         self.init_database()
+        
+        self._stats_cache = LRUCache(max_size=1, expiry_time=STATS_CACHE_TTL)
+        
+        # user_id -> row dict; invalidated by user writes
+        self._user_cache = LRUCache(max_size=USER_CACHE_SIZE, expiry_time=USER_CACHE_TTL)
+    
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open a connection that can be shared across handler threads"""
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        
+        # Connection-level tuning, applied once per pooled connection
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        return conn
     
+    @contextmanager
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_file)
+        """Borrow a pooled database connection"""
+        conn = self.pool.get()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.put(conn)
+    
+    def close(self):
+        """Close all pooled connections"""
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def init_database(self):
         """Initialize database tables"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Users table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT,
-                    first_name TEXT,
-                    last_name TEXT,
-                    is_admin INTEGER DEFAULT 0,
-                    is_banned INTEGER DEFAULT 0,
-                    joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_active TIMESTAMP,
-                    total_requests INTEGER DEFAULT 0,
-                    total_views INTEGER DEFAULT 0
-                )
-            ''')
-            
-            # Requests table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS requests (
-                    request_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    video_url TEXT NOT NULL,
-                    view_count INTEGER,
-                    view_time INTEGER,
-                    status TEXT DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                )
-            ''')
-            
-            # Statistics table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS statistics (
-                    stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    action TEXT,
-                    details TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                )
-            ''')
-            
-            # Rate limiting table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS rate_limits (
-                    user_id INTEGER PRIMARY KEY,
-                    minute_count INTEGER DEFAULT 0,
-                    hour_count INTEGER DEFAULT 0,
-                    day_count INTEGER DEFAULT 0,
-                    minute_reset TIMESTAMP,
-                    hour_reset TIMESTAMP,
-                    day_reset TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Users table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS users (
+                        user_id INTEGER PRIMARY KEY,
+                        username TEXT,
+                        first_name TEXT,
+                        last_name TEXT,
+                        is_admin INTEGER DEFAULT 0,
+                        is_banned INTEGER DEFAULT 0,
+                        joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_active TIMESTAMP,
+                        total_requests INTEGER DEFAULT 0,
+                        total_views INTEGER DEFAULT 0
+                    )
+                ''')
+                
+                # Requests table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS requests (
+                        request_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER NOT NULL,
+                        video_url TEXT NOT NULL,
+                        view_count INTEGER,
+                        view_time INTEGER,
+                        status TEXT DEFAULT 'pending',
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        completed_at TIMESTAMP,
+                        successful INTEGER DEFAULT 0,
+                        failed INTEGER DEFAULT 0,
+                        FOREIGN KEY (user_id) REFERENCES users(user_id)
+                    )
+                ''')
+                
+                # Older databases predate the per-request result columns
+                cursor.execute("PRAGMA table_info(requests)")
+                request_columns = {row[1] for row in cursor.fetchall()}
+                for column in ('successful', 'failed'):
+                    if column not in request_columns:
+                        cursor.execute(f"ALTER TABLE requests ADD COLUMN {column} INTEGER DEFAULT 0")
+                
+                # Statistics table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS statistics (
+                        stat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER,
+                        action TEXT,
+                        details TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (user_id) REFERENCES users(user_id)
+                    )
+                ''')
+                
+                # Rate limiting table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS rate_limits (
+                        user_id INTEGER PRIMARY KEY,
+                        minute_count INTEGER DEFAULT 0,
+                        hour_count INTEGER DEFAULT 0,
+                        day_count INTEGER DEFAULT 0,
+                        minute_reset TIMESTAMP,
+                        hour_reset TIMESTAMP,
+                        day_reset TIMESTAMP
+                    )
+                ''')
+                
+                # Indexes for per-user history and status counts
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_requests_user_created
+                    ON requests(user_id, created_at DESC)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_requests_status
+                    ON requests(status)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_statistics_user
+                    ON statistics(user_id)
+                ''')
+                
+                conn.commit()
             logger.info("Database initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
@@ -468,33 +796,47 @@ class DatabaseManager:
     def add_user(self, user_id: int, username: str, first_name: str, last_name: str) -> bool:
         """Add new user to database"""
         try:
-            with self.lock:
-                conn = self.get_connection()
+            with self.lock, self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
                     INSERT OR IGNORE INTO users 
                     (user_id, username, first_name, last_name, joined_date)
                     VALUES (?, ?, ?, ?, ?)
-                ''', (user_id, username, first_name, last_name, datetime.now()))
+                ''', (user_id, username, first_name, last_name, _now()))
                 
                 conn.commit()
-                conn.close()
-                logger.info(f"User {user_id} added to database")
-                return True
+            self._invalidate_user(user_id)
+            logger.info(f"User {user_id} added to database")
+            return True
         except Exception as e:
             logger.error(f"Error adding user: {e}")
             return False
     
+    def _invalidate_user(self, user_id: int):
+        """Drop a cached user row after it has been written"""
+        self._user_cache.pop(user_id)
+    
     def get_user(self, user_id: int) -> Optional[Dict]:
-        """Get user information"""
+        """Get user information, served from cache when fresh"""
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return cached.copy()
+        
+        user = self._get_user_uncached(user_id)
+        if user is not None:
+            self._user_cache.set(user_id, user)
+            return user.copy()
+        
+        return None
+    
+    def _get_user_uncached(self, user_id: int) -> Optional[Dict]:
+        """Read user information from the database"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
-            row = cursor.fetchone()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+                row = cursor.fetchone()
             
             if row:
                 return {
@@ -517,52 +859,79 @@ class DatabaseManager:
     def update_user_activity(self, user_id: int):
         """Update user's last active time"""
         try:
-            with self.lock:
-                conn = self.get_connection()
+            with self.lock, self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
                     UPDATE users SET last_active = ? WHERE user_id = ?
-                ''', (datetime.now(), user_id))
+                ''', (_now(), user_id))
                 
                 conn.commit()
-                conn.close()
+            self._invalidate_user(user_id)
         except Exception as e:
             logger.error(f"Error updating user activity: {e}")
     
-    def add_request(self, user_id: int, video_url: str, view_count: int, view_time: int) -> bool:
-        """Add new request to database"""
+    def add_request_sync(self, user_id: int, video_url: str, view_count: int, view_time: int) -> Optional[int]:
+        """Add new request to database immediately and return its request_id"""
         try:
-            with self.lock:
-                conn = self.get_connection()
+            with self.lock, self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
                     INSERT INTO requests 
                     (user_id, video_url, view_count, view_time, status, created_at)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', (user_id, video_url, view_count, view_time, 'pending', datetime.now()))
+                ''', (user_id, video_url, view_count, view_time, 'pending', _now()))
                 
                 conn.commit()
-                conn.close()
-                return True
+            return cursor.lastrowid
         except Exception as e:
             logger.error(f"Error adding request: {e}")
+            return None
+    
+    def finalize_request(self, request_id: int, successful: int, failed: int) -> bool:
+        """Record the outcome of a request and credit its user in one transaction"""
+        try:
+            with self.lock, self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT user_id FROM requests WHERE request_id = ?", (request_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return False
+                user_id = row[0]
+                
+                cursor.execute('''
+                    UPDATE requests
+                    SET status = 'completed', completed_at = ?, successful = ?, failed = ?
+                    WHERE request_id = ?
+                ''', (_now(), successful, failed, request_id))
+                
+                cursor.execute('''
+                    UPDATE users
+                    SET total_requests = total_requests + 1, total_views = total_views + ?
+                    WHERE user_id = ?
+                ''', (successful, user_id))
+                
+                conn.commit()
+            self._invalidate_user(user_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error finalizing request {request_id}: {e}")
             return False
     
     def get_user_requests(self, user_id: int, limit: int = 10) -> List[Dict]:
         """Get user's recent requests"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM requests WHERE user_id = ? 
-                ORDER BY created_at DESC LIMIT ?
-            ''', (user_id, limit))
-            
-            rows = cursor.fetchall()
-            conn.close()
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT * FROM requests WHERE user_id = ? 
+                    ORDER BY created_at DESC, request_id DESC LIMIT ?
+                ''', (user_id, limit))
+                
+                rows = cursor.fetchall()
             
             requests_list = []
             for row in rows:
@@ -574,7 +943,9 @@ class DatabaseManager:
                     'view_time': row[4],
                     'status': row[5],
                     'created_at': row[6],
-                    'completed_at': row[7]
+                    'completed_at': row[7],
+                    'successful': row[8],
+                    'failed': row[9]
                 })
             
             return requests_list
@@ -583,31 +954,31 @@ class DatabaseManager:
             return []
     
     def get_statistics(self) -> Dict:
-        """Get bot statistics"""
+        """Get bot statistics, cached for STATS_CACHE_TTL seconds"""
+        cached = self._stats_cache.get('stats')
+        if cached is not None:
+            return cached.copy()
+        
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT COUNT(*) FROM users')
-            total_users = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM requests')
-            total_requests = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT SUM(total_views) FROM users')
-            total_views = cursor.fetchone()[0] or 0
-            
-            cursor.execute('SELECT COUNT(*) FROM requests WHERE status = "completed"')
-            completed_requests = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            return {
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT
+                        (SELECT COUNT(*) FROM users),
+                        (SELECT COUNT(*) FROM requests),
+                        (SELECT COALESCE(SUM(total_views), 0) FROM users),
+                        (SELECT COUNT(*) FROM requests WHERE status = 'completed')
+                ''')
+                total_users, total_requests, total_views, completed_requests = cursor.fetchone()
+            
+            stats = {
                 'total_users': total_users,
                 'total_requests': total_requests,
                 'total_views': total_views,
                 'completed_requests': completed_requests
             }
+            self._stats_cache.set('stats', stats)
+            return stats.copy()
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
             return {}
@@ -619,68 +990,173 @@ class DatabaseManager:
 class RateLimiter:
     """Rate limiting system for users"""
     
+    # Sliding window lengths in seconds: minute, hour, day
+    WINDOW_PERIODS = (60, 3600, 86400)
+    
     def __init__(self, db_manager: DatabaseManager):
         """Initialize rate limiter"""
         self.db = db_manager
         self.lock = threading.Lock()
+        self.windows: Dict[int, Tuple[deque, deque, deque]] = defaultdict(lambda: (deque(), deque(), deque()))
+        self.dirty_users = set()
+        self.load()
+    
+    def _trim(self, windows: Tuple[deque, deque, deque], now: float):
+        """Drop timestamps that have slid out of each window"""
+        for window, period in zip(windows, self.WINDOW_PERIODS):
+            cutoff = now - period
+            while window and window[0] <= cutoff:
+                window.popleft()
+    
+    def load(self):
+        """Seed windows from the counts persisted before the last restart"""
+        wall_now = time.time()
+        try:
+            with self.db.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT user_id, minute_count, hour_count, day_count,
+                           minute_reset, hour_reset, day_reset
+                    FROM rate_limits WHERE day_reset > ?
+                ''', (wall_now,)).fetchall()
+        except Exception as e:
+            logger.error(f"Error loading rate limits: {e}")
+            return
+        
+        now = time.monotonic()
+        with self.lock:
+            for user_id, *row in rows:
+                windows = self.windows[user_id]
+                for window, period, count, reset in zip(windows, self.WINDOW_PERIODS, row[:3], row[3:]):
+                    if count and reset and reset > wall_now:
+                        # Individual timestamps aren't stored, so the whole count
+                        # expires with the oldest one; a restart never extends a limit
+                        window.extend([now - period + (reset - wall_now)] * count)
     
     def check_rate_limit(self, user_id: int) -> Tuple[bool, str]:
         """Check if user is within rate limits"""
         try:
             with self.lock:
-                conn = self.db.get_connection()
-                cursor = conn.cursor()
-                
-                now = datetime.now()
-                minute_ago = now - timedelta(minutes=1)
-                hour_ago = now - timedelta(hours=1)
-                day_ago = now - timedelta(days=1)
+                now = time.monotonic()
+                windows = self.windows[user_id]
+                self._trim(windows, now)
                 
-                cursor.execute('''
-                    SELECT minute_count, hour_count, day_count FROM rate_limits
-                    WHERE user_id = ?
-                ''', (user_id,))
-                
-                row = cursor.fetchone()
-                
-                if not row:
-                    cursor.execute('''
-                        INSERT INTO rate_limits (user_id, minute_count, hour_count, day_count)
-                        VALUES (?, 0, 0, 0)
-                    ''', (user_id,))
-                    conn.commit()
-                    conn.close()
-                    return True, "OK"
+                minute_window, hour_window, day_window = windows
                 
-                minute_count, hour_count, day_count = row
+                if len(minute_window) >= RATE_LIMIT_VISITS_PER_MINUTE:
+                    return False, f"Minute limit exceeded ({len(minute_window)}/{RATE_LIMIT_VISITS_PER_MINUTE})"
                 
-                if minute_count >= RATE_LIMIT_VISITS_PER_MINUTE:
-                    conn.close()
-                    return False, f"Minute limit exceeded ({minute_count}/{RATE_LIMIT_VISITS_PER_MINUTE})"
+                if len(hour_window) >= RATE_LIMIT_VISITS_PER_HOUR:
+                    return False, f"Hour limit exceeded ({len(hour_window)}/{RATE_LIMIT_VISITS_PER_HOUR})"
                 
-                if hour_count >= RATE_LIMIT_VISITS_PER_HOUR:
-                    conn.close()
-                    return False, f"Hour limit exceeded ({hour_count}/{RATE_LIMIT_VISITS_PER_HOUR})"
+                if len(day_window) >= RATE_LIMIT_VISITS_PER_DAY:
+                    return False, f"Day limit exceeded ({len(day_window)}/{RATE_LIMIT_VISITS_PER_DAY})"
                 
-                if day_count >= RATE_LIMIT_VISITS_PER_DAY:
-                    conn.close()
-                    return False, f"Day limit exceeded ({day_count}/{RATE_LIMIT_VISITS_PER_DAY})"
+                for window in windows:
+                    window.append(now)
                 
-                cursor.execute('''
-                    UPDATE rate_limits 
-                    SET minute_count = minute_count + 1,
-                        hour_count = hour_count + 1,
-                        day_count = day_count + 1
-                    WHERE user_id = ?
-                ''', (user_id,))
-                
-                conn.commit()
-                conn.close()
+                self.dirty_users.add(user_id)
                 return True, "OK"
         
         except Exception as e:
             logger.error(f"Error checking rate limit: {e}")
             return False, "Error checking rate limit"
+    
+    def flush(self):
+        """Persist windows of users checked since the last flush and forget idle users"""
+        now = time.monotonic()
+        wall_now = time.time()
+        with self.lock:
+            rows = []
+            for user_id in self.dirty_users:
+                windows = self.windows[user_id]
+                self._trim(windows, now)
+                # Each window's reset is when its oldest timestamp expires
+                resets = [
+                    window[0] + period - now + wall_now if window else None
+                    for window, period in zip(windows, self.WINDOW_PERIODS)
+                ]
+                rows.append((user_id, *(len(window) for window in windows), *resets))
+            self.dirty_users.clear()
+            
+            # Every check lands in the day window too, so an empty day window means idle
+            for user_id, windows in list(self.windows.items()):
+                self._trim(windows, now)
+                if not windows[2]:
+                    del self.windows[user_id]
+        
+        try:
+            with self.db.lock, self.db.get_connection() as conn:
+                if rows:
+                    conn.executemany('''
+                        INSERT OR REPLACE INTO rate_limits
+                        (user_id, minute_count, hour_count, day_count,
+                         minute_reset, hour_reset, day_reset)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', rows)
+                conn.execute(
+                    "DELETE FROM rate_limits WHERE day_reset IS NULL OR day_reset <= ?",
+                    (wall_now,)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error flushing rate limits: {e}")
+
+# ============================================================================
+# ASYNC HELPERS
+# ============================================================================
+
+async def run_blocking(func: Callable, *args) -> Any:
+    """Run a blocking call in the default executor so the event loop stays free"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+def _rate_limit_pause(status: int, headers) -> Optional[float]:
+    """Seconds to rest a proxy when the response says it is rate limited, else None"""
+    if status != 429 and headers.get('X-RateLimit-Remaining') != '0':
+        return None
+    
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    return float(PROXY_RATE_LIMIT_PAUSE)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: grow by a step on success, halve on failure"""
+    
+    def __init__(self, initial: int, minimum: int, maximum: int, step: float = 0.5):
+        """Initialize limiter"""
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+    
+    async def acquire(self):
+        """Wait for a free slot under the current limit"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+    
+    async def release(self, ok: bool):
+        """Free a slot and adjust the limit from the request outcome"""
+        async with self._cond:
+            self.in_flight -= 1
+            if ok:
+                self.limit = min(self.maximum, self.limit + self.step)
+            else:
+                self.limit = max(self.minimum, self.limit * 0.5)
+            self._cond.notify_all()
 
 # ============================================================================
 # YOUTUBE VIEW SIMULATOR
@@ -693,74 +1169,86 @@ class YouTubeViewSimulator:
         """Initialize YouTube view simulator"""
         self.proxy_manager = proxy_manager
         self.user_agent_rotator = UserAgentRotator()
-        self.session_cache = {}
-        self.lock = threading.Lock()
+        # Header caches are per thread
+        self._tls = threading.local()
+    
+    def _headers_for(self, proxy: str) -> Dict[str, str]:
+        """Get this thread's headers for a proxy, sampling a user agent on first use"""
+        cache = getattr(self._tls, 'headers', None)
+        if cache is None:
+            cache = self._tls.headers = {}
+        
+        headers = cache.get(proxy)
+        if headers is None:
+            # Entries for proxies that left the pool are dropped wholesale
+            if len(cache) >= PROXY_POOL_SIZE * 2:
+                cache.clear()
+            headers = cache[proxy] = self.user_agent_rotator.get_headers()
+        return headers
+    
+    def _rotate_headers(self, proxy: str):
+        """Forget a proxy's headers so the next view samples a new user agent"""
+        cache = getattr(self._tls, 'headers', None)
+        if cache:
+            cache.pop(proxy, None)
     
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract video ID from YouTube URL"""
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        return None
+        return _parse_video_id(url)
     
     def validate_youtube_url(self, url: str) -> bool:
         """Validate if URL is a valid YouTube URL"""
-        video_id = self.extract_video_id(url)
-        return video_id is not None
+        return _parse_video_id(url) is not None
     
-    def simulate_view(self, video_url: str, view_time: int = DEFAULT_VIEW_TIME) -> Tuple[bool, str]:
-        """Simulate a single YouTube view"""
-        try:
-            video_id = self.extract_video_id(video_url)
-            if not video_id:
-                return False, "Invalid YouTube URL"
-            
-            proxy_info = self.proxy_manager.get_random_proxy()
-            if not proxy_info:
-                return False, "No available proxies"
-            
-            proxy_dict = {
-                "http": f"http://{proxy_info['proxy']}",
-                "https": f"http://{proxy_info['proxy']}"
-            }
-            
-            headers = self.user_agent_rotator.get_headers()
-            
-            try:
-                response = requests.get(
-                    f"https://www.youtube.com/watch?v={video_id}",
-                    proxies=proxy_dict,
-                    headers=headers,
-                    timeout=PROXY_TIMEOUT,
-                    allow_redirects=True
-                )
-                
-                if response.status_code == 200:
-                    self.proxy_manager.mark_success(proxy_info['proxy'])
-                    time.sleep(random.uniform(view_time * 0.8, view_time * 1.2))
-                    return True, "View simulated successfully"
-                else:
-                    self.proxy_manager.mark_failure(proxy_info['proxy'])
-                    return False, f"HTTP {response.status_code}"
-            
-            except Exception as e:
-                self.proxy_manager.mark_failure(proxy_info['proxy'])
-                return False, str(e)
+    def validate_youtube_urls(self, urls: List[str]) -> List[bool]:
+        """Validate many URLs with the single combined pattern; repeats hit the parse cache"""
+        return [_parse_video_id(url) is not None for url in urls]
+    
+    async def _simulate_view_async(self, session: aiohttp.ClientSession, watch_url: str,
+                                   dwell: float, limiter: AdaptiveConcurrency) -> Tuple[bool, str]:
+        """Simulate a single YouTube view on the shared event loop"""
+        proxy_info = self.proxy_manager.get_random_proxy(refresh=False)
+        if not proxy_info:
+            return False, "No available proxies"
         
+        # Only the request holds a slot; the dwell below costs no sockets
+        await limiter.acquire()
+        status = None
+        try:
+            # The body is never read; only the status and headers are needed
+            async with session.get(
+                watch_url,
+                proxy=proxy_info['url'],
+                headers=self._headers_for(proxy_info['proxy']),
+                timeout=aiohttp.ClientTimeout(total=PROXY_TIMEOUT),
+                allow_redirects=True
+            ) as response:
+                status = response.status
+                pause = _rate_limit_pause(status, response.headers)
         except Exception as e:
-            logger.error(f"Error simulating view: {e}")
-            return False, str(e)
+            self.proxy_manager.mark_failure(proxy_info['proxy'])
+            self._rotate_headers(proxy_info['proxy'])
+            return False, str(e) or type(e).__name__
+        finally:
+            await limiter.release(status == 200)
+        
+        if pause is not None:
+            self.proxy_manager.pause_proxy(proxy_info['proxy'], pause)
+            if status == 429:
+                return False, "HTTP 429"
+        
+        if status != 200:
+            self.proxy_manager.mark_failure(proxy_info['proxy'])
+            self._rotate_headers(proxy_info['proxy'])
+            return False, f"HTTP {status}"
+        
+        self.proxy_manager.mark_success(proxy_info['proxy'])
+        await asyncio.sleep(dwell)
+        return True, "View simulated successfully"
     
-    def simulate_views_batch(self, video_url: str, view_count: int, view_time: int = DEFAULT_VIEW_TIME) -> Dict:
-        """Simulate multiple views in batch"""
+    async def simulate_views_batch_async(self, video_url: str, view_count: int,
+                                         view_time: int = DEFAULT_VIEW_TIME) -> Dict:
+        """Simulate multiple views concurrently on one aiohttp session"""
         results = {
             'total': view_count,
             'successful': 0,
@@ -768,29 +1256,116 @@ class YouTubeViewSimulator:
             'errors': []
         }
         
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = []
-            for _ in range(view_count):
-                future = executor.submit(self.simulate_view, video_url, view_time)
-                futures.append(future)
-            
-            for future in as_completed(futures, timeout=THREAD_POOL_TIMEOUT):
-                try:
-                    success, message = future.result()
-                    if success:
-                        results['successful'] += 1
-                    else:
-                        results['failed'] += 1
-                        results['errors'].append(message)
-                except FuturesTimeoutError:
-                    results['failed'] += 1
-                    results['errors'].append("Timeout")
-                except Exception as e:
-                    results['failed'] += 1
-                    results['errors'].append(str(e))
+        video_id = self.extract_video_id(video_url)
+        if not video_id:
+            results['failed'] = view_count
+            results['errors'].append("Invalid YouTube URL")
+            return results
+        
+        # Refreshing scrapes over the network, so do it off the loop, once per batch
+        if self.proxy_manager.is_stale():
+            await run_blocking(self.proxy_manager._refresh_if_stale)
+        
+        watch_url = f"https://www.youtube.com/watch?v={video_id}"
+        limiter = AdaptiveConcurrency(MAX_WORKERS, MIN_VIEW_CONCURRENCY, VIEW_CONCURRENCY)
+        
+        # Draw every view's dwell jitter up front from this thread's generator
+        uniform = _rng().uniform
+        low, high = view_time * 0.8, view_time * 1.2
+        dwells = [uniform(low, high) for _ in range(view_count)]
+        connector = aiohttp.TCPConnector(limit=VIEW_CONCURRENCY, limit_per_host=64)
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            outcomes = await asyncio.gather(
+                *(self._simulate_view_async(session, watch_url, dwell, limiter) for dwell in dwells),
+                return_exceptions=True
+            )
+        
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                results['failed'] += 1
+                results['errors'].append(str(outcome))
+            elif outcome[0]:
+                results['successful'] += 1
+            else:
+                results['failed'] += 1
+                results['errors'].append(outcome[1])
         
         return results
 
+# ============================================================================
+# STATIC REPLIES
+# ============================================================================
+
+# Welcome message from config if available, otherwise the default
+_WELCOME_TEXT = ''
+if MODULES_LOADED and isinstance(MESSAGES, dict):
+    _WELCOME_TEXT = MESSAGES.get('welcome', '')
+
+if not _WELCOME_TEXT:
+    _WELCOME_TEXT = (
+        "🎬 *Welcome to YouTube View Bot!*\n\n"
+        "This bot helps you simulate views on YouTube videos.\n\n"
+        "*Available Commands:*\n"
+        "🔗 /start - Start the bot\n"
+        "📊 /stats - View your statistics\n"
+        "🎥 /views - Simulate views on a video\n"
+        "📋 /history - View your request history\n"
+        "ℹ️ /help - Get help\n"
+        "⚙️ /settings - Adjust settings\n\n"
+        "*Admin Commands:*\n"
+        "👥 /users - View total users\n"
+        "📈 /botstats - View bot statistics\n"
+        "🔄 /proxies - Manage proxies\n"
+    )
+
+_HELP_TEXT = (
+    "📚 *Help Guide*\n\n"
+    "*How to use this bot:*\n\n"
+    "1️⃣ Send a YouTube video link\n"
+    "2️⃣ Specify the number of views you want\n"
+    "3️⃣ Choose the view duration\n"
+    "4️⃣ Confirm and start the process\n\n"
+    "*Supported URL formats:*\n"
+    "• https://www.youtube.com/watch?v=VIDEO_ID\n"
+    "• https://youtu.be/VIDEO_ID\n"
+    "• https://www.youtube.com/embed/VIDEO_ID\n\n"
+    "*Rate Limits:*\n"
+    f"• Per minute: {RATE_LIMIT_VISITS_PER_MINUTE}\n"
+    f"• Per hour: {RATE_LIMIT_VISITS_PER_HOUR}\n"
+    f"• Per day: {RATE_LIMIT_VISITS_PER_DAY}\n\n"
+    "*View Duration:*\n"
+    f"• Minimum: {MIN_VIEW_TIME} seconds\n"
+    f"• Maximum: {MAX_VIEW_TIME} seconds\n"
+    f"• Default: {DEFAULT_VIEW_TIME} seconds\n"
+)
+
+_CONFIRM_TEMPLATE = (
+    "📋 *Confirm Your Request*\n\n"
+    "🔗 Video URL: {url}\n"
+    "👁️ Views: {views}\n"
+    "⏱️ Duration per view: {time}s\n\n"
+    "✅ Confirm to start the process?"
+)
+
+_RESULT_TEMPLATE = (
+    "✅ *Process Completed*\n\n"
+    "👁️ Total Views: {total}\n"
+    "✅ Successful: {successful}\n"
+    "❌ Failed: {failed}\n"
+    "Success Rate: {success_rate:.1f}%\n"
+)
+
+# Only the confirm button varies per user
+_CANCEL_BUTTON = InlineKeyboardButton("❌ Cancel", callback_data="cancel")
+
+_START_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 My Stats", callback_data="stats"),
+     InlineKeyboardButton("🎥 Add Views", callback_data="add_views")],
+    [InlineKeyboardButton("📋 History", callback_data="history"),
+     InlineKeyboardButton("ℹ️ Help", callback_data="help")],
+])
+
 # ============================================================================
 # TELEGRAM BOT HANDLERS
 # ============================================================================
@@ -804,47 +1379,17 @@ class TelegramBotHandlers:
         self.proxy_manager = proxy_manager
         self.rate_limiter = RateLimiter(db_manager)
         self.youtube_simulator = YouTubeViewSimulator(proxy_manager)
-        self.user_sessions = {}
+        # In-progress conversations, dropped after USER_SESSION_TTL
+        self.user_sessions = LRUCache(max_size=USER_SESSION_MAX, expiry_time=USER_SESSION_TTL)
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         try:
             user = update.effective_user
-            self.db.add_user(user.id, user.username, user.first_name, user.last_name)
-            self.db.update_user_activity(user.id)
-            
-            # Use welcome message from config if available, otherwise use default
-            welcome_text = ''
-            if MODULES_LOADED and isinstance(MESSAGES, dict):
-                welcome_text = MESSAGES.get('welcome', '')
-            
-            # Fallback message if config not available or empty
-            if not welcome_text:
-                welcome_text = (
-                    "🎬 *Welcome to YouTube View Bot!*\n\n"
-                    "This bot helps you simulate views on YouTube videos.\n\n"
-                    "*Available Commands:*\n"
-                    "🔗 /start - Start the bot\n"
-                    "📊 /stats - View your statistics\n"
-                    "🎥 /views - Simulate views on a video\n"
-                    "📋 /history - View your request history\n"
-                    "ℹ️ /help - Get help\n"
-                    "⚙️ /settings - Adjust settings\n\n"
-                    "*Admin Commands:*\n"
-                    "👥 /users - View total users\n"
-                    "📈 /botstats - View bot statistics\n"
-                    "🔄 /proxies - Manage proxies\n"
-                )
+            await run_blocking(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
+            await run_blocking(self.db.update_user_activity, user.id)
             
-            keyboard = [
-                [InlineKeyboardButton("📊 My Stats", callback_data="stats"),
-                 InlineKeyboardButton("🎥 Add Views", callback_data="add_views")],
-                [InlineKeyboardButton("📋 History", callback_data="history"),
-                 InlineKeyboardButton("ℹ️ Help", callback_data="help")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await update.message.reply_text(welcome_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
+            await update.message.reply_text(_WELCOME_TEXT, parse_mode=ParseMode.MARKDOWN, reply_markup=_START_MARKUP)
             logger.info(f"User {user.id} started the bot")
         
         except Exception as e:
@@ -854,28 +1399,7 @@ class TelegramBotHandlers:
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
         try:
-            help_text = (
-                "📚 *Help Guide*\n\n"
-                "*How to use this bot:*\n\n"
-                "1️⃣ Send a YouTube video link\n"
-                "2️⃣ Specify the number of views you want\n"
-                "3️⃣ Choose the view duration\n"
-                "4️⃣ Confirm and start the process\n\n"
-                "*Supported URL formats:*\n"
-                "• https://www.youtube.com/watch?v=VIDEO_ID\n"
-                "• https://youtu.be/VIDEO_ID\n"
-                "• https://www.youtube.com/embed/VIDEO_ID\n\n"
-                "*Rate Limits:*\n"
-                f"• Per minute: {RATE_LIMIT_VISITS_PER_MINUTE}\n"
-                f"• Per hour: {RATE_LIMIT_VISITS_PER_HOUR}\n"
-                f"• Per day: {RATE_LIMIT_VISITS_PER_DAY}\n\n"
-                "*View Duration:*\n"
-                f"• Minimum: {MIN_VIEW_TIME} seconds\n"
-                f"• Maximum: {MAX_VIEW_TIME} seconds\n"
-                f"• Default: {DEFAULT_VIEW_TIME} seconds\n"
-            )
-            
-            await update.message.reply_text(help_text, parse_mode=ParseMode.MARKDOWN)
+            await update.message.reply_text(_HELP_TEXT, parse_mode=ParseMode.MARKDOWN)
         
         except Exception as e:
             logger.error(f"Error in help_command: {e}")
@@ -885,7 +1409,7 @@ class TelegramBotHandlers:
         """Handle /stats command"""
         try:
             user_id = update.effective_user.id
-            user_data = self.db.get_user(user_id)
+            user_data = await run_blocking(self.db.get_user, user_id)
             
             if not user_data:
                 await update.message.reply_text("❌ User not found. Please use /start first.")
@@ -911,21 +1435,22 @@ class TelegramBotHandlers:
         """Handle /history command"""
         try:
             user_id = update.effective_user.id
-            requests_list = self.db.get_user_requests(user_id, limit=5)
+            requests_list = await run_blocking(self.db.get_user_requests, user_id, 5)
             
             if not requests_list:
                 await update.message.reply_text("📋 No request history found.")
                 return
             
-            history_text = "📋 *Your Recent Requests*\n\n"
-            for req in requests_list:
-                history_text += (
-                    f"🔗 URL: {req['video_url'][:50]}...\n"
-                    f"👁️ Views: {req['view_count']}\n"
-                    f"⏱️ Duration: {req['view_time']}s\n"
-                    f"✅ Status: {req['status']}\n"
-                    f"📅 Date: {req['created_at']}\n\n"
-                )
+            parts = ["📋 *Your Recent Requests*\n\n"]
+            parts.extend(
+                f"🔗 URL: {req['video_url'][:50]}...\n"
+                f"👁️ Views: {req['view_count']}\n"
+                f"⏱️ Duration: {req['view_time']}s\n"
+                f"✅ Status: {req['status']}\n"
+                f"📅 Date: {req['created_at']}\n\n"
+                for req in requests_list
+            )
+            history_text = "".join(parts)
             
             await update.message.reply_text(history_text, parse_mode=ParseMode.MARKDOWN)
         
@@ -994,7 +1519,7 @@ class TelegramBotHandlers:
                 )
                 return WAITING_FOR_URL
             
-            self.user_sessions[user_id] = {'url': url}
+            self.user_sessions.set(user_id, {'url': url})
             
             await update.message.reply_text(
                 f"✅ URL accepted: {url}\n\n"
@@ -1014,7 +1539,8 @@ class TelegramBotHandlers:
         try:
             user_id = update.effective_user.id
             
-            if user_id not in self.user_sessions:
+            session = self.user_sessions.get(user_id)
+            if session is None:
                 await update.message.reply_text("❌ Session expired. Please use /views again.")
                 return
             
@@ -1032,7 +1558,7 @@ class TelegramBotHandlers:
                 )
                 return WAITING_FOR_VIEWS
             
-            self.user_sessions[user_id]['views'] = view_count
+            session['views'] = view_count
             
             await update.message.reply_text(
                 f"⏱️ How long should each view last? (5-3600 seconds)\n\n"
@@ -1051,7 +1577,8 @@ class TelegramBotHandlers:
         try:
             user_id = update.effective_user.id
             
-            if user_id not in self.user_sessions:
+            session = self.user_sessions.get(user_id)
+            if session is None:
                 await update.message.reply_text("❌ Session expired. Please use /views again.")
                 return
             
@@ -1069,22 +1596,14 @@ class TelegramBotHandlers:
                 )
                 return WAITING_FOR_TIME
             
-            self.user_sessions[user_id]['time'] = view_time
+            session['time'] = view_time
             
-            session = self.user_sessions[user_id]
-            confirmation_text = (
-                "📋 *Confirm Your Request*\n\n"
-                f"🔗 Video URL: {session['url']}\n"
-                f"👁️ Views: {session['views']}\n"
-                f"⏱️ Duration per view: {session['time']}s\n\n"
-                "✅ Confirm to start the process?"
-            )
+            confirmation_text = _CONFIRM_TEMPLATE.format_map(session)
             
-            keyboard = [
+            reply_markup = InlineKeyboardMarkup([
                 [InlineKeyboardButton("✅ Confirm", callback_data=f"confirm_views_{user_id}"),
-                 InlineKeyboardButton("❌ Cancel", callback_data="cancel")],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+                 _CANCEL_BUTTON],
+            ])
             
             await update.message.reply_text(confirmation_text, parse_mode=ParseMode.MARKDOWN, reply_markup=reply_markup)
             
@@ -1095,6 +1614,48 @@ class TelegramBotHandlers:
             await update.message.reply_text("❌ Error processing view time. Please try again.")
             return WAITING_FOR_TIME
     
+    async def _run_view_request(self, query, user_id: int, session: Dict):
+        """Record a confirmed request, run its view batch and report the results"""
+        try:
+            # Add request to database; results are written once at the end
+            request_id = await run_blocking(
+                self.db.add_request_sync,
+                user_id,
+                session['url'],
+                session['views'],
+                session['time']
+            )
+            
+            results = await self.youtube_simulator.simulate_views_batch_async(
+                session['url'],
+                session['views'],
+                session['time']
+            )
+            
+            if request_id is not None:
+                await run_blocking(
+                    self.db.finalize_request,
+                    request_id,
+                    results['successful'],
+                    results['failed']
+                )
+            
+            success_rate = results['successful'] / results['total'] * 100 if results['total'] else 0.0
+            result_text = _RESULT_TEMPLATE.format(success_rate=success_rate, **results)
+            
+            await query.edit_message_text(result_text, parse_mode=ParseMode.MARKDOWN)
+        except BadRequest as e:
+            logger.warning(f"Could not report view results to user {user_id}: {e}")
+        except Exception as e:
+            logger.error(f"Error simulating views: {e}")
+            try:
+                await query.edit_message_text(
+                    f"❌ Error processing views: {str(e)}\n"
+                    "Please try again later."
+                )
+            except TelegramError:
+                pass
+    
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks"""
         try:
@@ -1120,54 +1681,22 @@ class TelegramBotHandlers:
                 await self.help_command(update, context)
             
             elif query.data == "cancel":
-                if user_id in self.user_sessions:
-                    del self.user_sessions[user_id]
+                self.user_sessions.pop(user_id)
                 await query.edit_message_text("❌ Request cancelled.")
                 return ConversationHandler.END
             
             elif query.data.startswith("confirm_views_"):
-                if user_id in self.user_sessions:
-                    session = self.user_sessions[user_id]
-                    
+                session = self.user_sessions.pop(user_id)
+                if session is not None:
                     await query.edit_message_text(
                         "⏳ Processing your request...\n"
                         "This may take a few moments."
                     )
                     
-                    # Add request to database
-                    self.db.add_request(
-                        user_id,
-                        session['url'],
-                        session['views'],
-                        session['time']
+                    # Run the batch as its own task so other updates keep flowing
+                    context.application.create_task(
+                        self._run_view_request(query, user_id, session), update=update
                     )
-                    
-                    # Simulate views in background to avoid blocking
-                    try:
-                        results = self.youtube_simulator.simulate_views_batch(
-                            session['url'],
-                            session['views'],
-                            session['time']
-                        )
-                        
-                        result_text = (
-                            "✅ *Process Completed*\n\n"
-                            f"👁️ Total Views: {results['total']}\n"
-                            f"✅ Successful: {results['successful']}\n"
-                            f"❌ Failed: {results['failed']}\n"
-                            f"Success Rate: {(results['successful']/results['total']*100):.1f}%\n"
-                        )
-                        
-                        await query.edit_message_text(result_text, parse_mode=ParseMode.MARKDOWN)
-                    except Exception as e:
-                        logger.error(f"Error simulating views: {e}")
-                        await query.edit_message_text(
-                            f"❌ Error processing views: {str(e)}\n"
-                            "Please try again later."
-                        )
-                    finally:
-                        if user_id in self.user_sessions:
-                            del self.user_sessions[user_id]
                 else:
                     await query.edit_message_text("❌ Session expired. Please use /views again.")
         
@@ -1194,18 +1723,18 @@ class AdminCommands:
         self.db = db_manager
         self.proxy_manager = proxy_manager
     
-    async def is_admin(self, user_id: int) -> bool:
+    def is_admin(self, user_id: int) -> bool:
         """Check if user is admin"""
-        return user_id in ADMIN_IDS
+        return user_id in _ADMIN_IDS
     
     async def botstats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /botstats command"""
         try:
-            if not await self.is_admin(update.effective_user.id):
+            if not self.is_admin(update.effective_user.id):
                 await update.message.reply_text("❌ You don't have permission to use this command.")
                 return
             
-            stats = self.db.get_statistics()
+            stats = await run_blocking(self.db.get_statistics)
             
             stats_text = (
                 "📊 *Bot Statistics*\n\n"
@@ -1224,7 +1753,7 @@ class AdminCommands:
     async def proxies_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /proxies command"""
         try:
-            if not await self.is_admin(update.effective_user.id):
+            if not self.is_admin(update.effective_user.id):
                 await update.message.reply_text("❌ You don't have permission to use this command.")
                 return
             
@@ -1247,13 +1776,13 @@ class AdminCommands:
     async def refresh_proxies_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /refresh_proxies command"""
         try:
-            if not await self.is_admin(update.effective_user.id):
+            if not self.is_admin(update.effective_user.id):
                 await update.message.reply_text("❌ You don't have permission to use this command.")
                 return
             
             await update.message.reply_text("⏳ Refreshing proxy pool...")
             
-            count = self.proxy_manager.refresh_proxies()
+            count = await run_blocking(self.proxy_manager.refresh_proxies)
             
             await update.message.reply_text(
                 f"✅ Proxy pool refreshed!\n"
@@ -1267,11 +1796,11 @@ class AdminCommands:
     async def users_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /users command"""
         try:
-            if not await self.is_admin(update.effective_user.id):
+            if not self.is_admin(update.effective_user.id):
                 await update.message.reply_text("❌ You don't have permission to use this command.")
                 return
             
-            stats = self.db.get_statistics()
+            stats = await run_blocking(self.db.get_statistics)
             
             users_text = (
                 "👥 *User Statistics*\n\n"
@@ -1301,6 +1830,7 @@ class TelegramYouTubeBot:
         self.handlers = TelegramBotHandlers(self.db_manager, self.proxy_manager)
         self.admin_commands = AdminCommands(self.db_manager, self.proxy_manager)
         self.application = None
+        self.rate_limit_flush_task = None
         
         # Initialize advanced features if modules are loaded
         if MODULES_LOADED:
@@ -1313,7 +1843,7 @@ class TelegramYouTubeBot:
                 self.analytics = None
             
             try:
-                self.notifications = NotificationManager()
+                self.notifications = NotificationManager(NOTIFICATION_SNAPSHOT_FILE)
                 logger.info("  ✅ Notification Manager initialized")
             except Exception as e:
                 logger.warning(f"  ⚠️  Notification Manager failed: {e}")
@@ -1326,6 +1856,12 @@ class TelegramYouTubeBot:
                 logger.warning(f"  ⚠️  Task Scheduler failed: {e}")
                 self.scheduler = None
             
+            if self.notifications and self.scheduler:
+                self.scheduler.add_task(
+                    "notif_snapshot", NOTIFICATION_SNAPSHOT_INTERVAL,
+                    self.notifications.save_snapshot
+                )
+            
             try:
                 self.preferences = UserPreferences()
                 logger.info("  ✅ User Preferences initialized")
@@ -1388,8 +1924,7 @@ class TelegramYouTubeBot:
     async def cancel_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle cancel command"""
         user_id = update.effective_user.id
-        if user_id in self.handlers.user_sessions:
-            del self.handlers.user_sessions[user_id]
+        self.handlers.user_sessions.pop(user_id)
         
         await update.message.reply_text("❌ Operation cancelled.")
         return ConversationHandler.END
@@ -1427,15 +1962,36 @@ class TelegramYouTubeBot:
             except Exception as e:
                 logger.warning(f"Error loading proxies: {e}. Bot will continue without proxies initially.")
             
+            self.rate_limit_flush_task = asyncio.create_task(self._flush_rate_limits_periodically())
+            
             logger.info("✅ Bot startup completed successfully")
         except Exception as e:
             logger.error(f"Error during startup: {e}")
             # Don't fail startup - bot should continue running
     
+    async def _flush_rate_limits_periodically(self):
+        """Write in-memory rate limit counters to the database"""
+        while True:
+            await asyncio.sleep(RATE_LIMIT_FLUSH_INTERVAL)
+            try:
+                await run_blocking(self.handlers.rate_limiter.flush)
+            except Exception as e:
+                logger.error(f"Error in rate limit flush task: {e}")
+    
     async def shutdown(self, application):
         """Shutdown tasks"""
         logger.info("Bot shutting down...")
+        if self.rate_limit_flush_task:
+            self.rate_limit_flush_task.cancel()
+        self.handlers.rate_limiter.flush()
         self.proxy_manager.save_to_cache()
+        if self.analytics:
+            self.analytics.close()
+        if self.notifications:
+            self.notifications.save_snapshot()
+        if self.preferences:
+            self.preferences.close()
+        self.db_manager.close()
         logger.info("Bot shutdown completed")
     
     def run(self):
@@ -1477,8 +2033,9 @@ class TelegramYouTubeBot:
                     time.sleep(retry_delay)
                     retry_delay *= 2  # Exponential backoff
                 else:
-                    logger.error("Max retries reached. Giving up.")
-                    traceback.print_exc()
+                    logger.exception("Max retries reached. Giving up.")
+                    # Exit non-zero so a supervisor restarts the process
+                    sys.exit(1)
             
             except Exception as e:
                 logger.error(f"Unexpected error running bot: {e}")
@@ -1487,8 +2044,9 @@ class TelegramYouTubeBot:
                     time.sleep(retry_delay)
                     retry_delay *= 2  # Exponential backoff
                 else:
-                    logger.error("Max retries reached. Giving up.")
-                    traceback.print_exc()
+                    logger.exception("Max retries reached. Giving up.")
+                    # Exit non-zero so a supervisor restarts the process
+                    sys.exit(1)
 
 # ============================================================================
 # MAIN ENTRY POINT
@@ -1496,13 +2054,17 @@ class TelegramYouTubeBot:
 
 def main():
     """Main entry point - Starts all bot components"""
-    logger.info("=" * 80)
-    logger.info("TELEGRAM YOUTUBE VIEW BOT - STARTING")
-    logger.info("=" * 80)
-    logger.info(f"Version: {BOT_VERSION if MODULES_LOADED else '2.0'}")
-    logger.info(f"Author: @LEGEND_BL")
-    logger.info(f"Modules Loaded: {'✅ YES' if MODULES_LOADED else '⚠️  STANDALONE MODE'}")
-    logger.info("=" * 80)
+    rule = "=" * 80
+    # One record per block rather than one per line
+    logger.info("\n".join([
+        rule,
+        "TELEGRAM YOUTUBE VIEW BOT - STARTING",
+        rule,
+        f"Version: {BOT_VERSION if MODULES_LOADED else '2.0'}",
+        "Author: @LEGEND_BL",
+        f"Modules Loaded: {'✅ YES' if MODULES_LOADED else '⚠️  STANDALONE MODE'}",
+        rule,
+    ]))
     
     # Validate configuration
     if MODULES_LOADED:
@@ -1515,19 +2077,23 @@ def main():
     
     if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE" or BOT_TOKEN == "":
         logger.error("❌ BOT_TOKEN not configured. Please set TELEGRAM_BOT_TOKEN environment variable.")
-        logger.info("")
-        logger.info("   To fix this:")
-        logger.info("   1. Get a bot token from @BotFather on Telegram")
-        logger.info("   2. Export it: export TELEGRAM_BOT_TOKEN='your_token_here'")
-        logger.info("   3. Or add it to config.py")
-        logger.info("")
+        logger.info("\n".join([
+            "",
+            "   To fix this:",
+            "   1. Get a bot token from @BotFather on Telegram",
+            "   2. Export it: export TELEGRAM_BOT_TOKEN='your_token_here'",
+            "   3. Or add it to config.py",
+            "",
+        ]))
         sys.exit(1)
     
-    logger.info("✅ Bot token configured")
-    logger.info(f"📊 Max Workers: {MAX_WORKERS}")
-    logger.info(f"🔄 Proxy Pool Size: {PROXY_POOL_SIZE}")
-    logger.info(f"⏱️  View Time: {MIN_VIEW_TIME}s - {MAX_VIEW_TIME}s")
-    logger.info("=" * 80)
+    logger.info("\n".join([
+        "✅ Bot token configured",
+        f"📊 Max Workers: {MAX_WORKERS}",
+        f"🔄 Proxy Pool Size: {PROXY_POOL_SIZE}",
+        f"⏱️  View Time: {MIN_VIEW_TIME}s - {MAX_VIEW_TIME}s",
+        rule,
+    ]))
     
     try:
         bot = TelegramYouTubeBot(BOT_TOKEN)
@@ -1535,14 +2101,15 @@ def main():
         bot.run()
         logger.info("✅ Bot exited normally")
     except KeyboardInterrupt:
-        logger.info("\n")
-        logger.info("=" * 80)
-        logger.info("👋 Bot interrupted by user (Ctrl+C)")
-        logger.info("Shutting down gracefully...")
-        logger.info("=" * 80)
+        logger.info("\n".join([
+            "\n",
+            rule,
+            "👋 Bot interrupted by user (Ctrl+C)",
+            "Shutting down gracefully...",
+            rule,
+        ]))
     except Exception as e:
-        logger.error(f"❌ Fatal error in main: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Fatal error in main: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
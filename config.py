@@ -8,70 +8,98 @@ Version: 2.0
 """
 
 import os
-import json
-from typing import Dict, Any, Optional, Tuple
-from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, List, Mapping
+
+# ============================================================================
+# ENVIRONMENT HELPERS
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def _env_str(name: str, default: str = "") -> str:
+    """Read a string setting from the environment"""
+    return os.getenv(name, default)
+
+@lru_cache(maxsize=None)
+def _env_int(name: str, default: Optional[int] = 0) -> Optional[int]:
+    """Read an integer setting; unset or empty falls back to default"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+@lru_cache(maxsize=None)
+def _env_bool(name: str, default: bool = False) -> bool:
+    """Read a true/false setting"""
+    return os.getenv(name, "true" if default else "false").lower() == "true"
+
+@lru_cache(maxsize=None)
+def _admin_ids() -> Tuple[int, ...]:
+    """Parse the comma-separated ADMIN_IDS setting"""
+    return tuple(int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip())
 
 # ============================================================================
 # ENVIRONMENT VARIABLES
 # ============================================================================
 
 # Bot Configuration
-BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-BOT_NAME = os.getenv("BOT_NAME", "YouTube View Bot")
+BOT_TOKEN = _env_str("TELEGRAM_BOT_TOKEN", "")
+BOT_NAME = _env_str("BOT_NAME", "YouTube View Bot")
 BOT_VERSION = "2.0"
 BOT_AUTHOR = "@LEGEND_BL"
 
 # Database Configuration
-DATABASE_FILE = os.getenv("DATABASE_FILE", "telegram_bot.db")
-ANALYTICS_DB = os.getenv("ANALYTICS_DB", "analytics.db")
-PREFERENCES_DB = os.getenv("PREFERENCES_DB", "user_preferences.db")
+DATABASE_FILE = _env_str("DATABASE_FILE", "telegram_bot.db")
+ANALYTICS_DB = _env_str("ANALYTICS_DB", "analytics.db")
+PREFERENCES_DB = _env_str("PREFERENCES_DB", "user_preferences.db")
 
 # Cache Configuration
-PROXY_CACHE_FILE = os.getenv("PROXY_CACHE_FILE", "proxy_cache.json")
-USERS_CACHE_FILE = os.getenv("USERS_CACHE_FILE", "users_cache.json")
-STATS_FILE = os.getenv("STATS_FILE", "bot_stats.json")
+PROXY_CACHE_FILE = _env_str("PROXY_CACHE_FILE", "proxy_cache.json")
+USERS_CACHE_FILE = _env_str("USERS_CACHE_FILE", "users_cache.json")
+STATS_FILE = _env_str("STATS_FILE", "bot_stats.json")
 
 # Logging Configuration
-LOG_FILE = os.getenv("LOG_FILE", "telegram_bot.log")
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FILE = _env_str("LOG_FILE", "telegram_bot.log")
+LOG_LEVEL = _env_str("LOG_LEVEL", "INFO")
+# Rotate the log file at this size, keeping this many old files; 0 never rotates
+LOG_MAX_BYTES = _env_int("LOG_MAX_BYTES", 0)
+LOG_BACKUP_COUNT = _env_int("LOG_BACKUP_COUNT", 0)
 
 # Admin Configuration
-ADMIN_IDS = [int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip()]
-OWNER_ID = int(os.getenv("OWNER_ID", "0")) if os.getenv("OWNER_ID") else 0
-SUPPORT_CHAT_ID = int(os.getenv("SUPPORT_CHAT_ID", "0")) if os.getenv("SUPPORT_CHAT_ID") else None
+ADMIN_IDS = list(_admin_ids())
+OWNER_ID = _env_int("OWNER_ID", 0)
+SUPPORT_CHAT_ID = _env_int("SUPPORT_CHAT_ID", None)
 
 # ============================================================================
 # YOUTUBE VIEW CONFIGURATION
 # ============================================================================
 
 # View time constraints
-MIN_VIEW_TIME = int(os.getenv("MIN_VIEW_TIME", "5"))
-MAX_VIEW_TIME = int(os.getenv("MAX_VIEW_TIME", "3600"))
-DEFAULT_VIEW_TIME = int(os.getenv("DEFAULT_VIEW_TIME", "30"))
+MIN_VIEW_TIME = _env_int("MIN_VIEW_TIME", 5)
+MAX_VIEW_TIME = _env_int("MAX_VIEW_TIME", 3600)
+DEFAULT_VIEW_TIME = _env_int("DEFAULT_VIEW_TIME", 30)
 
 # View limits
-MIN_VIEW_COUNT = int(os.getenv("MIN_VIEW_COUNT", "1"))
-MAX_VIEW_COUNT = int(os.getenv("MAX_VIEW_COUNT", "1000"))
-DEFAULT_VIEW_COUNT = int(os.getenv("DEFAULT_VIEW_COUNT", "100"))
+MIN_VIEW_COUNT = _env_int("MIN_VIEW_COUNT", 1)
+MAX_VIEW_COUNT = _env_int("MAX_VIEW_COUNT", 1000)
+DEFAULT_VIEW_COUNT = _env_int("DEFAULT_VIEW_COUNT", 100)
 
 # ============================================================================
 # RATE LIMITING CONFIGURATION
 # ============================================================================
 
-RATE_LIMIT_VISITS_PER_MINUTE = int(os.getenv("RATE_LIMIT_VISITS_PER_MINUTE", "15"))
-RATE_LIMIT_VISITS_PER_HOUR = int(os.getenv("RATE_LIMIT_VISITS_PER_HOUR", "150"))
-RATE_LIMIT_VISITS_PER_DAY = int(os.getenv("RATE_LIMIT_VISITS_PER_DAY", "1000"))
+RATE_LIMIT_VISITS_PER_MINUTE = _env_int("RATE_LIMIT_VISITS_PER_MINUTE", 15)
+RATE_LIMIT_VISITS_PER_HOUR = _env_int("RATE_LIMIT_VISITS_PER_HOUR", 150)
+RATE_LIMIT_VISITS_PER_DAY = _env_int("RATE_LIMIT_VISITS_PER_DAY", 1000)
 
 # ============================================================================
 # PROXY CONFIGURATION
 # ============================================================================
 
-PROXY_TIMEOUT = int(os.getenv("PROXY_TIMEOUT", "12"))
-PROXY_VALIDATION_INTERVAL = int(os.getenv("PROXY_VALIDATION_INTERVAL", "3600"))
-MAX_PROXY_FAILURES = int(os.getenv("MAX_PROXY_FAILURES", "5"))
-PROXY_POOL_SIZE = int(os.getenv("PROXY_POOL_SIZE", "150"))
-MIN_PROXY_POOL_SIZE = int(os.getenv("MIN_PROXY_POOL_SIZE", "50"))
+PROXY_TIMEOUT = _env_int("PROXY_TIMEOUT", 12)
+PROXY_VALIDATION_INTERVAL = _env_int("PROXY_VALIDATION_INTERVAL", 3600)
+MAX_PROXY_FAILURES = _env_int("MAX_PROXY_FAILURES", 5)
+PROXY_POOL_SIZE = _env_int("PROXY_POOL_SIZE", 150)
+MIN_PROXY_POOL_SIZE = _env_int("MIN_PROXY_POOL_SIZE", 50)
 
 PROXY_SOURCES = [
     "https://www.proxy-list.download/api/v1/get?type=http",
@@ -84,33 +112,33 @@ PROXY_SOURCES = [
 # THREADING CONFIGURATION
 # ============================================================================
 
-MAX_WORKERS = int(os.getenv("MAX_WORKERS", "75"))
-THREAD_POOL_TIMEOUT = int(os.getenv("THREAD_POOL_TIMEOUT", "45"))
+MAX_WORKERS = _env_int("MAX_WORKERS", 75)
+THREAD_POOL_TIMEOUT = _env_int("THREAD_POOL_TIMEOUT", 45)
 
 # ============================================================================
 # CACHE CONFIGURATION
 # ============================================================================
 
-CACHE_EXPIRY = int(os.getenv("CACHE_EXPIRY", "3600"))
-MAX_CACHE_SIZE = int(os.getenv("MAX_CACHE_SIZE", "1000"))
+CACHE_EXPIRY = _env_int("CACHE_EXPIRY", 3600)
+MAX_CACHE_SIZE = _env_int("MAX_CACHE_SIZE", 1000)
 
 # ============================================================================
 # FEATURE FLAGS
 # ============================================================================
 
-ENABLE_ANALYTICS = os.getenv("ENABLE_ANALYTICS", "true").lower() == "true"
-ENABLE_NOTIFICATIONS = os.getenv("ENABLE_NOTIFICATIONS", "true").lower() == "true"
-ENABLE_SCHEDULING = os.getenv("ENABLE_SCHEDULING", "true").lower() == "true"
-ENABLE_PLUGINS = os.getenv("ENABLE_PLUGINS", "false").lower() == "true"
-ENABLE_PREMIUM = os.getenv("ENABLE_PREMIUM", "false").lower() == "true"
+ENABLE_ANALYTICS = _env_bool("ENABLE_ANALYTICS", True)
+ENABLE_NOTIFICATIONS = _env_bool("ENABLE_NOTIFICATIONS", True)
+ENABLE_SCHEDULING = _env_bool("ENABLE_SCHEDULING", True)
+ENABLE_PLUGINS = _env_bool("ENABLE_PLUGINS", False)
+ENABLE_PREMIUM = _env_bool("ENABLE_PREMIUM", False)
 
 # ============================================================================
 # API CONFIGURATION
 # ============================================================================
 
-API_TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
-API_RETRIES = int(os.getenv("API_RETRIES", "3"))
-API_RETRY_DELAY = int(os.getenv("API_RETRY_DELAY", "2"))
+API_TIMEOUT = _env_int("API_TIMEOUT", 30)
+API_RETRIES = _env_int("API_RETRIES", 3)
+API_RETRY_DELAY = _env_int("API_RETRY_DELAY", 2)
 
 # ============================================================================
 # CONVERSATION STATES
@@ -161,6 +189,68 @@ MESSAGES = {
 # CONFIGURATION CLASS
 # ============================================================================
 
+# path -> (mtime_ns, parsed data); a file is re-parsed only after it changes
+_config_file_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+def _read_config_file(path: str) -> Dict[str, Any]:
+    """Parse a JSON config file, reusing the last parse while its mtime is unchanged"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _config_file_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        import orjson
+        data = orjson.loads(raw)
+    except ImportError:
+        import json
+        data = json.loads(raw)
+    
+    _config_file_cache[path] = (mtime, data)
+    return data
+
+def _dumps_config(data: Dict[str, Any]) -> bytes:
+    """Serialize config data as indented JSON bytes"""
+    try:
+        import orjson
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    except ImportError:
+        import json
+        return json.dumps(data, indent=2).encode()
+
+@lru_cache(maxsize=None)
+def get_config() -> Mapping[str, Any]:
+    """Build the resolved configuration once and share a read-only view"""
+    return MappingProxyType({
+        'BOT_TOKEN': BOT_TOKEN,
+        'BOT_NAME': BOT_NAME,
+        'BOT_VERSION': BOT_VERSION,
+        'DATABASE_FILE': DATABASE_FILE,
+        'LOG_FILE': LOG_FILE,
+        'LOG_LEVEL': LOG_LEVEL,
+        'LOG_MAX_BYTES': LOG_MAX_BYTES,
+        'LOG_BACKUP_COUNT': LOG_BACKUP_COUNT,
+        'ADMIN_IDS': ADMIN_IDS,
+        'MIN_VIEW_TIME': MIN_VIEW_TIME,
+        'MAX_VIEW_TIME': MAX_VIEW_TIME,
+        'DEFAULT_VIEW_TIME': DEFAULT_VIEW_TIME,
+        'RATE_LIMIT_VISITS_PER_MINUTE': RATE_LIMIT_VISITS_PER_MINUTE,
+        'RATE_LIMIT_VISITS_PER_HOUR': RATE_LIMIT_VISITS_PER_HOUR,
+        'RATE_LIMIT_VISITS_PER_DAY': RATE_LIMIT_VISITS_PER_DAY,
+        'PROXY_TIMEOUT': PROXY_TIMEOUT,
+        'PROXY_POOL_SIZE': PROXY_POOL_SIZE,
+        'MAX_WORKERS': MAX_WORKERS,
+        'CACHE_EXPIRY': CACHE_EXPIRY,
+        'MAX_CACHE_SIZE': MAX_CACHE_SIZE,
+        'ENABLE_ANALYTICS': ENABLE_ANALYTICS,
+        'ENABLE_NOTIFICATIONS': ENABLE_NOTIFICATIONS,
+        'ENABLE_SCHEDULING': ENABLE_SCHEDULING,
+        'ENABLE_PLUGINS': ENABLE_PLUGINS,
+        'ENABLE_PREMIUM': ENABLE_PREMIUM,
+    })
+
 class Config:
     """Configuration management class"""
     
@@ -168,27 +258,19 @@ class Config:
     _config_file = "bot_config.json"
     
     def __new__(cls):
+        # The file is read once, when the singleton is first created
         if cls._instance is None:
-            cls._instance = super(Config, cls).__new__(cls)
-            cls._instance._initialized = False
+            instance = super(Config, cls).__new__(cls)
+            instance.load_from_file()
+            cls._instance = instance
         return cls._instance
     
-    def __init__(self):
-        """Initialize configuration"""
-        if self._initialized:
-            return
-        
-        self._initialized = True
-        self.load_from_file()
-    
     def load_from_file(self):
         """Load configuration from file"""
         if os.path.exists(self._config_file):
             try:
-                with open(self._config_file, 'r') as f:
-                    config_data = json.load(f)
-                    for key, value in config_data.items():
-                        setattr(self, key, value)
+                for key, value in _read_config_file(self._config_file).items():
+                    setattr(self, key, value)
             except Exception as e:
                 print(f"Error loading config file: {e}")
     
@@ -212,8 +294,8 @@ class Config:
                 'ENABLE_PREMIUM': ENABLE_PREMIUM,
             }
             
-            with open(self._config_file, 'w') as f:
-                json.dump(config_data, f, indent=2)
+            with open(self._config_file, 'wb') as f:
+                f.write(_dumps_config(config_data))
         except Exception as e:
             print(f"Error saving config file: {e}")
     
@@ -227,31 +309,7 @@ class Config:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary"""
-        return {
-            'BOT_TOKEN': BOT_TOKEN,
-            'BOT_NAME': BOT_NAME,
-            'BOT_VERSION': BOT_VERSION,
-            'DATABASE_FILE': DATABASE_FILE,
-            'LOG_FILE': LOG_FILE,
-            'LOG_LEVEL': LOG_LEVEL,
-            'ADMIN_IDS': ADMIN_IDS,
-            'MIN_VIEW_TIME': MIN_VIEW_TIME,
-            'MAX_VIEW_TIME': MAX_VIEW_TIME,
-            'DEFAULT_VIEW_TIME': DEFAULT_VIEW_TIME,
-            'RATE_LIMIT_VISITS_PER_MINUTE': RATE_LIMIT_VISITS_PER_MINUTE,
-            'RATE_LIMIT_VISITS_PER_HOUR': RATE_LIMIT_VISITS_PER_HOUR,
-            'RATE_LIMIT_VISITS_PER_DAY': RATE_LIMIT_VISITS_PER_DAY,
-            'PROXY_TIMEOUT': PROXY_TIMEOUT,
-            'PROXY_POOL_SIZE': PROXY_POOL_SIZE,
-            'MAX_WORKERS': MAX_WORKERS,
-            'CACHE_EXPIRY': CACHE_EXPIRY,
-            'MAX_CACHE_SIZE': MAX_CACHE_SIZE,
-            'ENABLE_ANALYTICS': ENABLE_ANALYTICS,
-            'ENABLE_NOTIFICATIONS': ENABLE_NOTIFICATIONS,
-            'ENABLE_SCHEDULING': ENABLE_SCHEDULING,
-            'ENABLE_PLUGINS': ENABLE_PLUGINS,
-            'ENABLE_PREMIUM': ENABLE_PREMIUM,
-        }
+        return dict(get_config())
 
 # ============================================================================
 # VALIDATION FUNCTIONS
@@ -292,6 +350,8 @@ __all__ = [
     'DATABASE_FILE',
     'LOG_FILE',
     'LOG_LEVEL',
+    'LOG_MAX_BYTES',
+    'LOG_BACKUP_COUNT',
     'ADMIN_IDS',
     'OWNER_ID',
     'MIN_VIEW_TIME',
@@ -312,5 +372,6 @@ __all__ = [
     'ENABLE_PREMIUM',
     'MESSAGES',
     'Config',
+    'get_config',
     'validate_config',
 ]
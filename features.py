@@ -8,71 +8,151 @@ Version: 2.0
 """
 
 import os
+import re
 import json
 import time
 import logging
 import threading
 import sqlite3
-import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
-from collections import defaultdict
-import pickle
-import queue
+from typing import Dict, List, Optional, Any, Callable, Deque, Iterator, Tuple
+from collections import defaultdict, deque, OrderedDict
+import itertools
+import heapq
+import atexit
+from contextlib import closing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Events are written in batches of up to this many, at least once per interval
+ANALYTICS_BATCH_SIZE = 500
+ANALYTICS_FLUSH_INTERVAL = 1.0
+
+# Past this many unwritten events the oldest are dropped rather than growing without bound
+ANALYTICS_MAX_BUFFER = 100_000
+ANALYTICS_DROP_WARN_INTERVAL = 60
+
+# Longest wait for the writer thread at shutdown before the final flush
+ANALYTICS_CLOSE_TIMEOUT = 5.0
+
+# Notifications are snapshotted here so a restart does not lose them
+NOTIFICATION_SNAPSHOT_FILE = "notifications.json"
+NOTIFICATION_SNAPSHOT_INTERVAL = 60
+
+# Failed scheduled tasks are retried after this many seconds
+TASK_RETRY_DELAY = 1
+
+# Decoded preferences kept in memory for this many users, for up to this many seconds
+PREFERENCES_CACHE_SIZE = 1024
+PREFERENCES_CACHE_TTL = 60
+
+# Bumped whenever init_database learns a new preferences migration
+PREFERENCES_SCHEMA_VERSION = 1
+
 # ============================================================================
 # ANALYTICS ENGINE
 # ============================================================================
 
+def _dumps_text(data: Any) -> str:
+    """Serialize to a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        # Non-string keys are stringified, as json.dumps does
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data)
+
+# Accepts str or bytes, like json.loads
+_loads = orjson.loads if orjson is not None else json.loads
+
+
 class AnalyticsEngine:
     """Advanced analytics and reporting engine"""
     
+    # Fixed SQL text lets each connection's statement cache reuse the prepared plan
+    _SQL_INSERT_EVENT = '''
+        INSERT INTO events (event_type, user_id, data, timestamp)
+        VALUES (?, ?, ?, ?)
+    '''
+    _SQL_UPSERT_USER = '''
+        INSERT INTO user_analytics (user_id, total_events, last_event)
+        VALUES (?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            total_events = user_analytics.total_events + excluded.total_events,
+            last_event = MAX(COALESCE(user_analytics.last_event, ''), excluded.last_event)
+    '''
+    _SQL_USER_ANALYTICS = '''
+        SELECT total_events, last_event, engagement_score
+        FROM user_analytics WHERE user_id = ?
+    '''
+    _SQL_STATS_BY_TYPE = '''
+        SELECT event_type, COUNT(*) as count
+        FROM events WHERE timestamp > ?
+        GROUP BY event_type
+    '''
+    
     def __init__(self, db_file: str = "analytics.db"):
         """Initialize analytics engine"""
         self.db_file = db_file
         self.lock = threading.Lock()
-        self.events = queue.Queue()
+        # append/popleft are atomic, so producers never take a lock
+        self.events: deque = deque(maxlen=ANALYTICS_MAX_BUFFER)
+        self.dropped = 0
+        self._last_drop_warning = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._tls = threading.local()
+        # Every thread's connection, so close() can release them all
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
         self.init_database()
         self.start_event_processor()
+        atexit.register(self.close)
     
     def init_database(self):
         """Initialize analytics database"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS events (
-                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    event_type TEXT NOT NULL,
-                    user_id INTEGER,
-                    data TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS metrics (
-                    metric_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    metric_name TEXT NOT NULL,
-                    metric_value REAL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_analytics (
-                    user_id INTEGER PRIMARY KEY,
-                    total_events INTEGER DEFAULT 0,
-                    last_event TIMESTAMP,
-                    engagement_score REAL DEFAULT 0
-                )
-            ''')
+            # closing() releases the handle even when a statement fails;
+            # the inner "with conn" commits or rolls back
+            with closing(sqlite3.connect(self.db_file)) as conn, conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS events (
+                        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        event_type TEXT NOT NULL,
+                        user_id INTEGER,
+                        data TEXT,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS metrics (
+                        metric_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        metric_name TEXT NOT NULL,
+                        metric_value REAL,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS user_analytics (
+                        user_id INTEGER PRIMARY KEY,
+                        total_events INTEGER DEFAULT 0,
+                        last_event TIMESTAMP,
+                        engagement_score REAL DEFAULT 0
+                    )
+                ''')
+                
+                # Let get_event_statistics seek the time window instead of scanning
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_ts ON events(timestamp)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(event_type, timestamp)')
             
-            conn.commit()
-            conn.close()
             logger.info("Analytics database initialized")
         except Exception as e:
             logger.error(f"Error initializing analytics database: {e}")
@@ -83,72 +163,140 @@ class AnalyticsEngine:
             event = {
                 'event_type': event_type,
                 'user_id': user_id,
-                'data': json.dumps(data) if data else None,
-                'timestamp': datetime.now()
+                # Serialized by the writer thread, off the caller's path
+                'data': data or None,
+                # Epoch float; formatted to text by the writer thread
+                'timestamp': time.time()
             }
-            self.events.put(event)
+            if len(self.events) >= ANALYTICS_MAX_BUFFER:
+                self._note_dropped()
+            self.events.append(event)
+            self._wake.set()
         except Exception as e:
             logger.error(f"Error tracking event: {e}")
     
+    def _note_dropped(self):
+        """Count an event evicted from the full buffer, warning at most once per interval"""
+        self.dropped += 1
+        now = time.monotonic()
+        if now - self._last_drop_warning >= ANALYTICS_DROP_WARN_INTERVAL:
+            self._last_drop_warning = now
+            logger.warning(
+                f"Analytics buffer full ({ANALYTICS_MAX_BUFFER} events), "
+                f"{self.dropped} events dropped so far"
+            )
+    
     def start_event_processor(self):
         """Start background event processor"""
-        thread = threading.Thread(target=self._process_events, daemon=True)
-        thread.start()
+        self._thread = threading.Thread(target=self._process_events, daemon=True)
+        self._thread.start()
+    
+    def _drain(self, limit: Optional[int] = None) -> List[Dict]:
+        """Pop up to limit buffered events, oldest first"""
+        batch = []
+        try:
+            while limit is None or len(batch) < limit:
+                batch.append(self.events.popleft())
+        except IndexError:
+            pass
+        return batch
     
     def _process_events(self):
-        """Process events from queue"""
-        while True:
+        """Process buffered events in batches"""
+        while not self._stop.is_set():
+            self._wake.wait(timeout=ANALYTICS_FLUSH_INTERVAL)
+            self._wake.clear()
+            
+            # Keep draining while a backlog remains, without waiting in between
+            while self.events:
+                try:
+                    self._save_events(self._drain(ANALYTICS_BATCH_SIZE))
+                except Exception as e:
+                    logger.error(f"Error processing events: {e}")
+    
+    def flush(self):
+        """Write every buffered event now"""
+        batch = self._drain()
+        if batch:
+            self._save_events(batch)
+    
+    def close(self, timeout: float = ANALYTICS_CLOSE_TIMEOUT):
+        """Stop the writer thread and write whatever is still buffered"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self.flush()
+        
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
             try:
-                event = self.events.get(timeout=5)
-                self._save_event(event)
-            except queue.Empty:
-                continue
+                conn.close()
             except Exception as e:
-                logger.error(f"Error processing event: {e}")
-    
-    def _save_event(self, event: Dict):
-        """Save event to database"""
+                logger.error(f"Error closing analytics connection: {e}")
+        # Threads reopen lazily if used after close
+        self._tls = threading.local()
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening and tuning it on first use"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            # Autocommit; the batched writer issues its own BEGIN/COMMIT.
+            # check_same_thread=False only so close() can run from any thread
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA mmap_size=268435456')
+            self._tls.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+    
+    def _save_events(self, events: List[Dict]):
+        """Save a batch of events and their per-user totals in one transaction"""
+        # Stored as the same text sqlite3's datetime adapter produced
+        fromtimestamp = datetime.fromtimestamp
+        stamps = [fromtimestamp(e['timestamp']).isoformat(sep=' ') for e in events]
+        dumps = _dumps_text
+        rows = [
+            (e['event_type'], e['user_id'], dumps(e['data']) if e['data'] else None, stamp)
+            for e, stamp in zip(events, stamps)
+        ]
+        
+        # user_id -> [event count, latest timestamp]; ISO text sorts chronologically
+        per_user: Dict[int, List] = {}
+        for e, stamp in zip(events, stamps):
+            if e['user_id']:
+                totals = per_user.setdefault(e['user_id'], [0, stamp])
+                totals[0] += 1
+                totals[1] = max(totals[1], stamp)
+        
         try:
             with self.lock:
-                conn = sqlite3.connect(self.db_file)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO events (event_type, user_id, data, timestamp)
-                    VALUES (?, ?, ?, ?)
-                ''', (event['event_type'], event['user_id'], event['data'], event['timestamp']))
-                
-                # Update user analytics
-                if event['user_id']:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO user_analytics (user_id, total_events, last_event)
-                        VALUES (?, 1, ?)
-                    ''', (event['user_id'], event['timestamp']))
+                cursor = self._conn().cursor()
+                cursor.execute('BEGIN')
+                try:
+                    cursor.executemany(self._SQL_INSERT_EVENT, rows)
                     
-                    cursor.execute('''
-                        UPDATE user_analytics 
-                        SET total_events = total_events + 1, last_event = ?
-                        WHERE user_id = ?
-                    ''', (event['timestamp'], event['user_id']))
-                
-                conn.commit()
-                conn.close()
+                    # Update user analytics
+                    cursor.executemany(
+                        self._SQL_UPSERT_USER,
+                        [(user_id, count, last) for user_id, (count, last) in per_user.items()]
+                    )
+                    
+                    cursor.execute('COMMIT')
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
         except Exception as e:
-            logger.error(f"Error saving event: {e}")
+            logger.error(f"Error saving {len(events)} events: {e}")
     
     def get_user_analytics(self, user_id: int) -> Dict:
         """Get user analytics"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT total_events, last_event, engagement_score
-                FROM user_analytics WHERE user_id = ?
-            ''', (user_id,))
-            
-            row = cursor.fetchone()
-            conn.close()
+            row = self._conn().execute(self._SQL_USER_ANALYTICS, (user_id,)).fetchone()
             
             if row:
                 return {
@@ -164,24 +312,12 @@ class AnalyticsEngine:
     def get_event_statistics(self, days: int = 7) -> Dict:
         """Get event statistics for last N days"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            since = datetime.now() - timedelta(days=days)
-            
-            cursor.execute('''
-                SELECT event_type, COUNT(*) as count
-                FROM events WHERE timestamp > ?
-                GROUP BY event_type
-            ''', (since,))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            stats = {}
-            for event_type, count in rows:
-                stats[event_type] = count
+            # Same text form sqlite3 stores datetimes in, bound without the adapter
+            since = (datetime.now() - timedelta(days=days)).isoformat(sep=' ')
             
+            stats = dict(self._conn().execute(self._SQL_STATS_BY_TYPE, (since,)).fetchall())
+            if self.dropped:
+                stats['dropped_events'] = self.dropped
             return stats
         except Exception as e:
             logger.error(f"Error getting event statistics: {e}")
@@ -194,11 +330,21 @@ class AnalyticsEngine:
 class NotificationManager:
     """Manages notifications and alerts"""
     
-    def __init__(self):
+    def __init__(self, snapshot_file: Optional[str] = None):
         """Initialize notification manager"""
-        self.notifications: Dict[int, List[Dict]] = defaultdict(list)
         self.lock = threading.Lock()
         self.max_notifications = 100
+        self.snapshot_file = snapshot_file
+        # Full deques drop their oldest entry on append
+        self.notifications: Dict[int, Deque[Dict]] = defaultdict(
+            lambda: deque(maxlen=self.max_notifications)
+        )
+        # Per-user id sequence, so ids stay unique after old entries are evicted
+        self._next_ids: Dict[int, Iterator[int]] = defaultdict(itertools.count)
+        
+        if snapshot_file:
+            self.load_snapshot()
+            atexit.register(self.save_snapshot)
     
     def send_notification(self, user_id: int, title: str, message: str, 
                          notification_type: str = "info", data: Optional[Dict] = None):
@@ -206,7 +352,7 @@ class NotificationManager:
         try:
             with self.lock:
                 notification = {
-                    'id': len(self.notifications[user_id]),
+                    'id': next(self._next_ids[user_id]),
                     'title': title,
                     'message': message,
                     'type': notification_type,
@@ -217,23 +363,19 @@ class NotificationManager:
                 
                 self.notifications[user_id].append(notification)
                 
-                # Keep only last N notifications
-                if len(self.notifications[user_id]) > self.max_notifications:
-                    self.notifications[user_id] = self.notifications[user_id][-self.max_notifications:]
-                
                 logger.info(f"Notification sent to user {user_id}: {title}")
         except Exception as e:
             logger.error(f"Error sending notification: {e}")
     
     def get_notifications(self, user_id: int, unread_only: bool = False) -> List[Dict]:
         """Get user notifications"""
-        with self.lock:
-            notifications = self.notifications.get(user_id, [])
-            
-            if unread_only:
-                notifications = [n for n in notifications if not n['read']]
-            
-            return notifications.copy()
+        # Lock-free read: dict.get and list(deque) each run atomically in C
+        notifications = list(self.notifications.get(user_id, ()))
+        
+        if unread_only:
+            return [n for n in notifications if not n['read']]
+        
+        return notifications
     
     def mark_as_read(self, user_id: int, notification_id: int) -> bool:
         """Mark notification as read"""
@@ -254,13 +396,59 @@ class NotificationManager:
         try:
             with self.lock:
                 if user_id in self.notifications:
-                    self.notifications[user_id] = []
+                    self.notifications[user_id].clear()
                     return True
         except Exception as e:
             logger.error(f"Error clearing notifications: {e}")
         
         return False
 
+    def save_snapshot(self) -> bool:
+        """Write all notifications to the snapshot file atomically"""
+        if not self.snapshot_file:
+            return False
+        try:
+            with self.lock:
+                snapshot = {
+                    str(user_id): [
+                        dict(n, timestamp=n['timestamp'].isoformat()) for n in notifications
+                    ]
+                    for user_id, notifications in self.notifications.items()
+                    if notifications
+                }
+            
+            tmp_file = f"{self.snapshot_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                f.write(_dumps_text(snapshot))
+            os.replace(tmp_file, self.snapshot_file)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving notification snapshot: {e}")
+            return False
+    
+    def load_snapshot(self) -> bool:
+        """Restore notifications saved by save_snapshot"""
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return False
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = _loads(f.read())
+            
+            with self.lock:
+                for user_id, notifications in snapshot.items():
+                    user_id = int(user_id)
+                    for n in notifications:
+                        n['timestamp'] = datetime.fromisoformat(n['timestamp'])
+                    self.notifications[user_id].extend(notifications)
+                    if notifications:
+                        self._next_ids[user_id] = itertools.count(
+                            max(n['id'] for n in notifications) + 1
+                        )
+            return True
+        except Exception as e:
+            logger.error(f"Error loading notification snapshot: {e}")
+            return False
+
 # ============================================================================
 # SCHEDULING SYSTEM
 # ============================================================================
@@ -272,9 +460,22 @@ class TaskScheduler:
         """Initialize task scheduler"""
         self.tasks: Dict[str, Dict] = {}
         self.lock = threading.Lock()
+        # Wakes the scheduler when the earliest deadline may have changed
+        self._cond = threading.Condition(self.lock)
+        # Min-heap of (monotonic due time, task_id); entries not matching
+        # self._due are stale and skipped
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
         self.running = False
         self.start()
     
+    def _schedule(self, task_id: str, delay: float):
+        """Queue a task to fire after delay seconds; caller holds the lock"""
+        due = time.monotonic() + delay
+        self._due[task_id] = due
+        heapq.heappush(self._heap, (due, task_id))
+        self._cond.notify()
+    
     def add_task(self, task_id: str, interval: int, callback: Callable, 
                  args: tuple = (), kwargs: dict = None):
         """Add a scheduled task"""
@@ -289,6 +490,7 @@ class TaskScheduler:
                     'next_run': time.time() + interval,
                     'enabled': True
                 }
+                self._schedule(task_id, interval)
                 logger.info(f"Task {task_id} scheduled with interval {interval}s")
         except Exception as e:
             logger.error(f"Error adding task: {e}")
@@ -299,6 +501,7 @@ class TaskScheduler:
             with self.lock:
                 if task_id in self.tasks:
                     del self.tasks[task_id]
+                    self._due.pop(task_id, None)
                     logger.info(f"Task {task_id} removed")
                     return True
         except Exception as e:
@@ -315,37 +518,69 @@ class TaskScheduler:
     
     def stop(self):
         """Stop the scheduler"""
-        self.running = False
+        with self.lock:
+            self.running = False
+            self._cond.notify()
         logger.info("Task scheduler stopped")
     
+    def _next_due_task(self) -> Optional[Tuple[str, Dict]]:
+        """Sleep until the earliest task is due and pop it; None once stopped"""
+        with self._cond:
+            while self.running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                
+                due, task_id = self._heap[0]
+                if self._due.get(task_id) != due:
+                    heapq.heappop(self._heap)
+                    continue
+                
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                
+                heapq.heappop(self._heap)
+                del self._due[task_id]
+                return task_id, self.tasks[task_id]
+        return None
+    
     def _run_scheduler(self):
         """Run the scheduler loop"""
         while self.running:
             try:
-                current_time = time.time()
+                entry = self._next_due_task()
+                if entry is None:
+                    break
+                task_id, task = entry
                 
-                with self.lock:
-                    for task_id, task in self.tasks.items():
-                        if task['enabled'] and current_time >= task['next_run']:
-                            try:
-                                task['callback'](*task['args'], **task['kwargs'])
-                                task['last_run'] = current_time
-                                task['next_run'] = current_time + task['interval']
-                            except Exception as e:
-                                logger.error(f"Error executing task {task_id}: {e}")
+                # Callbacks run outside the lock so add_task/remove_task never wait on them
+                retry_delay = task['interval']
+                if task['enabled']:
+                    try:
+                        task['callback'](*task['args'], **task['kwargs'])
+                        task['last_run'] = time.time()
+                    except Exception as e:
+                        logger.error(f"Error executing task {task_id}: {e}")
+                        retry_delay = TASK_RETRY_DELAY
                 
-                time.sleep(1)
+                with self.lock:
+                    # Skip rescheduling if the task was removed or replaced meanwhile
+                    if self.tasks.get(task_id) is task and task_id not in self._due:
+                        task['next_run'] = time.time() + retry_delay
+                        self._schedule(task_id, retry_delay)
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
     
     def get_task_info(self, task_id: str) -> Optional[Dict]:
         """Get task information"""
-        with self.lock:
-            if task_id in self.tasks:
-                task = self.tasks[task_id].copy()
-                # Remove callback for serialization
-                task.pop('callback', None)
-                return task
+        task = self.tasks.get(task_id)
+        if task is not None:
+            task = task.copy()
+            # Remove callback for serialization
+            task.pop('callback', None)
+            return task
         
         return None
 
@@ -353,6 +588,9 @@ class TaskScheduler:
 # PLUGIN SYSTEM
 # ============================================================================
 
+# fullmatch also rejects the trailing newline that '$' would let through
+_PLUGIN_NAME_RE = re.compile(r'[A-Za-z0-9_]+')
+
 class PluginManager:
     """Manage bot plugins and extensions"""
     
@@ -360,7 +598,8 @@ class PluginManager:
         """Initialize plugin manager"""
         self.plugins_dir = plugins_dir
         self.plugins: Dict[str, Any] = {}
-        self.hooks: Dict[str, List[Callable]] = defaultdict(list)
+        # Copy-on-write: register_hook swaps in a new tuple, so readers need no lock
+        self.hooks: Dict[str, Tuple[Callable, ...]] = {}
         self.lock = threading.Lock()
         
         if not os.path.exists(plugins_dir):
@@ -369,8 +608,11 @@ class PluginManager:
     def load_plugin(self, plugin_name: str) -> bool:
         """Load a plugin with validation"""
         try:
+            # Only plugin loading needs this; keep it off the import path
+            import importlib.util
+            
             # Validate plugin name (alphanumeric and underscore only)
-            if not re.match(r'^[a-zA-Z0-9_]+$', plugin_name):
+            if not _PLUGIN_NAME_RE.fullmatch(plugin_name):
                 logger.error(f"Invalid plugin name: {plugin_name}")
                 return False
             
@@ -388,7 +630,6 @@ class PluginManager:
                 return False
             
             # Import plugin in restricted manner
-            import importlib.util
             spec = importlib.util.spec_from_file_location(plugin_name, plugin_path)
             if spec is None or spec.loader is None:
                 logger.error(f"Cannot load plugin spec: {plugin_name}")
@@ -409,15 +650,12 @@ class PluginManager:
     def register_hook(self, hook_name: str, callback: Callable):
         """Register a hook callback"""
         with self.lock:
-            self.hooks[hook_name].append(callback)
+            self.hooks[hook_name] = self.hooks.get(hook_name, ()) + (callback,)
             logger.info(f"Hook {hook_name} registered")
     
     def execute_hook(self, hook_name: str, *args, **kwargs):
         """Execute all callbacks for a hook"""
-        with self.lock:
-            callbacks = self.hooks.get(hook_name, []).copy()
-        
-        for callback in callbacks:
+        for callback in self.hooks.get(hook_name, ()):
             try:
                 callback(*args, **kwargs)
             except Exception as e:
@@ -425,8 +663,8 @@ class PluginManager:
     
     def get_plugin(self, plugin_name: str) -> Optional[Any]:
         """Get loaded plugin"""
-        with self.lock:
-            return self.plugins.get(plugin_name)
+        # Writers hold the lock; a single dict.get is atomic for readers
+        return self.plugins.get(plugin_name)
 
 # ============================================================================
 # USER PREFERENCES
@@ -435,93 +673,211 @@ class PluginManager:
 class UserPreferences:
     """Manage user preferences and settings"""
     
+    # Fixed SQL text lets each connection's statement cache reuse the prepared plan
+    _SQL_GET = 'SELECT preferences FROM preferences WHERE user_id = ?'
+    _SQL_UPSERT = '''
+        INSERT INTO preferences (user_id, preferences) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            preferences = json_set(preferences{pairs}),
+            updated_at = CURRENT_TIMESTAMP
+    '''
+    _SQL_REPLACE = '''
+        INSERT INTO preferences (user_id, preferences) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            preferences = excluded.preferences,
+            updated_at = CURRENT_TIMESTAMP
+    '''
+    # Upsert text per number of keys, built once so repeats hit the statement cache
+    _upsert_sql: Dict[int, str] = {}
+    
     def __init__(self, db_file: str = "user_preferences.db"):
         """Initialize user preferences"""
         self.db_file = db_file
         self.lock = threading.Lock()
+        # One connection per thread, so reads never queue behind each other
+        self._tls = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        # user_id -> (prefs dict, cached_at); updated write-through by set_preference
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Bumped by every write, so a read that raced one does not cache its older row
+        self._cache_gen = 0
         self.init_database()
+        atexit.register(self.close)
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening and tuning it on first use"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            # Autocommit; check_same_thread=False only so close() can run from any thread
+            conn = sqlite3.connect(
+                self.db_file, check_same_thread=False, isolation_level=None,
+                cached_statements=256
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-64000')
+            self._tls.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
     
     def init_database(self):
-        """Initialize preferences database"""
+        """Initialize preferences database, migrating older schemas"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
+            conn = self._conn()
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= PREFERENCES_SCHEMA_VERSION:
+                return
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS preferences (
-                    user_id INTEGER PRIMARY KEY,
-                    preferences TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # WITHOUT ROWID keeps each row in the user_id B-tree itself,
+                # so a lookup touches one index instead of two
+                conn.execute('''
+                    CREATE TABLE preferences_new (
+                        user_id INTEGER PRIMARY KEY,
+                        preferences TEXT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    ) WITHOUT ROWID
+                ''')
+                
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'preferences'"
+                ).fetchone()
+                if exists:
+                    conn.execute('''
+                        INSERT INTO preferences_new (user_id, preferences, updated_at)
+                        SELECT user_id, COALESCE(preferences, '{}'), updated_at FROM preferences
+                    ''')
+                    conn.execute('DROP TABLE preferences')
+                
+                conn.execute('ALTER TABLE preferences_new RENAME TO preferences')
+                conn.execute(f'PRAGMA user_version = {PREFERENCES_SCHEMA_VERSION}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
         except Exception as e:
-            logger.error(f"Error initializing preferences database: {e}")
+            logger.error("Error initializing preferences database: %s", e)
+    
+    def close(self):
+        """Close every thread's connection"""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.error("Error closing preferences connection: %s", e)
+        # Threads reopen lazily if used after close
+        self._tls = threading.local()
     
     def set_preference(self, user_id: int, key: str, value: Any) -> bool:
         """Set user preference"""
+        return self.set_preferences(user_id, {key: value})
+    
+    def set_preferences(self, user_id: int, updates: Dict[str, Any]) -> bool:
+        """Set several user preferences in one statement; prefer this over repeated set_preference"""
+        if not updates:
+            return True
         try:
+            # JSON1 patches the stored object in place: no SELECT and no
+            # Python decode/encode of the existing blob
+            paths = []
+            for key, value in updates.items():
+                if '"' in key:
+                    raise ValueError(f"Invalid preference key: {key!r}")
+                paths.extend((f'$."{key}"', _dumps_text(value)))
+            
+            sql = self._upsert_sql.get(len(updates))
+            if sql is None:
+                sql = self._SQL_UPSERT.format(pairs=", ?, json(?)" * len(updates))
+                self._upsert_sql[len(updates)] = sql
+            
+            conn = self._conn()
             with self.lock:
-                conn = sqlite3.connect(self.db_file)
-                cursor = conn.cursor()
+                conn.execute(sql, (user_id, _dumps_text(updates), *paths))
                 
-                # Get existing preferences
-                cursor.execute('SELECT preferences FROM preferences WHERE user_id = ?', (user_id,))
-                row = cursor.fetchone()
-                
-                if row:
-                    prefs = json.loads(row[0])
-                else:
-                    prefs = {}
-                
-                prefs[key] = value
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO preferences (user_id, preferences, updated_at)
-                    VALUES (?, ?, ?)
-                ''', (user_id, json.dumps(prefs), datetime.now()))
-                
-                conn.commit()
-                conn.close()
+                # Write-through when the user is cached; otherwise the next read loads the row
+                with self._cache_lock:
+                    self._cache_gen += 1
+                    cached = self._cache.pop(user_id, None)
+                if cached is not None:
+                    self._cache_put(user_id, {**cached[0], **updates})
                 return True
         except Exception as e:
-            logger.error(f"Error setting preference: {e}")
+            logger.error("Error setting preferences: %s", e)
             return False
     
+    def bulk_set(self, items: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """Replace the preferences of many users in one transaction"""
+        try:
+            rows = [(user_id, _dumps_text(prefs)) for user_id, prefs in items]
+            
+            conn = self._conn()
+            with self.lock:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.executemany(self._SQL_REPLACE, rows)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                
+                with self._cache_lock:
+                    self._cache_gen += 1
+                    for user_id, prefs in items:
+                        self._cache.pop(user_id, None)
+            return True
+        except Exception as e:
+            logger.error("Error bulk setting preferences: %s", e)
+            return False
+    
+    def _cache_put(self, user_id: int, prefs: Dict):
+        """Store a user's decoded preferences, evicting the least recently used"""
+        with self._cache_lock:
+            self._cache[user_id] = (prefs, time.monotonic())
+            self._cache.move_to_end(user_id)
+            if len(self._cache) > PREFERENCES_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _cached_preferences(self, user_id: int) -> Dict:
+        """Get a user's preferences from cache, loading them on a miss; do not mutate"""
+        with self._cache_lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and time.monotonic() - cached[1] < PREFERENCES_CACHE_TTL:
+                self._cache.move_to_end(user_id)
+                return cached[0]
+            gen = self._cache_gen
+        
+        row = self._conn().execute(self._SQL_GET, (user_id,)).fetchone()
+        prefs = _loads(row[0]) if row else {}
+        
+        with self._cache_lock:
+            if self._cache_gen == gen:
+                self._cache[user_id] = (prefs, time.monotonic())
+                self._cache.move_to_end(user_id)
+                if len(self._cache) > PREFERENCES_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return prefs
+    
     def get_preference(self, user_id: int, key: str, default: Any = None) -> Any:
         """Get user preference"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT preferences FROM preferences WHERE user_id = ?', (user_id,))
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                prefs = json.loads(row[0])
-                return prefs.get(key, default)
+            return self._cached_preferences(user_id).get(key, default)
         except Exception as e:
-            logger.error(f"Error getting preference: {e}")
+            logger.error("Error getting preference: %s", e)
         
         return default
     
     def get_all_preferences(self, user_id: int) -> Dict:
         """Get all user preferences"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT preferences FROM preferences WHERE user_id = ?', (user_id,))
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row:
-                return json.loads(row[0])
+            return dict(self._cached_preferences(user_id))
         except Exception as e:
-            logger.error(f"Error getting preferences: {e}")
+            logger.error("Error getting preferences: %s", e)
         
         return {}
 
@@ -534,60 +890,77 @@ class CommandRegistry:
     
     def __init__(self):
         """Initialize command registry"""
+        # Copy-on-write: writers swap in new dicts under the lock, so
+        # dispatch reads a consistent snapshot without locking
         self.commands: Dict[str, Dict] = {}
+        self._alias_index: Dict[str, str] = {}
         self.lock = threading.Lock()
     
+    def _build_alias_index(self, commands: Dict[str, Dict]) -> Dict[str, str]:
+        """Map every alias to its command name; command names win over aliases"""
+        aliases = {}
+        for name, cmd_info in commands.items():
+            for alias in cmd_info['aliases']:
+                if alias not in commands:
+                    aliases.setdefault(alias, name)
+        return aliases
+    
     def register_command(self, name: str, handler: Callable, 
                         description: str = "", aliases: List[str] = None):
         """Register a command"""
         try:
             with self.lock:
-                self.commands[name] = {
+                commands = dict(self.commands)
+                commands[name] = {
                     'handler': handler,
                     'description': description,
                     'aliases': aliases or [],
                     'registered_at': datetime.now()
                 }
-                logger.info(f"Command {name} registered")
+                self._alias_index = self._build_alias_index(commands)
+                self.commands = commands
+                logger.info("Command %s registered", name)
         except Exception as e:
-            logger.error(f"Error registering command: {e}")
+            logger.error("Error registering command: %s", e)
     
     def unregister_command(self, name: str) -> bool:
         """Unregister a command"""
         try:
             with self.lock:
                 if name in self.commands:
-                    del self.commands[name]
-                    logger.info(f"Command {name} unregistered")
+                    commands = dict(self.commands)
+                    del commands[name]
+                    self.commands = commands
+                    self._alias_index = self._build_alias_index(commands)
+                    logger.info("Command %s unregistered", name)
                     return True
         except Exception as e:
-            logger.error(f"Error unregistering command: {e}")
+            logger.error("Error unregistering command: %s", e)
         
         return False
     
     def execute_command(self, name: str, *args, **kwargs) -> Any:
-        """Execute a command"""
+        """Execute a command by name or alias"""
         try:
-            with self.lock:
-                if name in self.commands:
-                    handler = self.commands[name]['handler']
-                    return handler(*args, **kwargs)
+            # The index never holds a command's own name, so names win over aliases
+            cmd_info = self.commands.get(self._alias_index.get(name, name))
+            if cmd_info is not None:
+                return cmd_info['handler'](*args, **kwargs)
         except Exception as e:
-            logger.error(f"Error executing command {name}: {e}")
+            logger.error("Error executing command %s: %s", name, e)
         
         return None
     
     def get_commands(self) -> List[Dict]:
         """Get all registered commands"""
-        with self.lock:
-            commands_list = []
-            for name, cmd_info in self.commands.items():
-                commands_list.append({
-                    'name': name,
-                    'description': cmd_info['description'],
-                    'aliases': cmd_info['aliases']
-                })
-            return commands_list
+        return [
+            {
+                'name': name,
+                'description': cmd_info['description'],
+                'aliases': cmd_info['aliases']
+            }
+            for name, cmd_info in self.commands.items()
+        ]
 
 # ============================================================================
 # EXPORT ALL FEATURES
@@ -9,12 +9,20 @@ Version: 2.0
 
 import os
 import sys
+import time
 import subprocess
 import json
 import platform
 from pathlib import Path
+from importlib.util import find_spec
+from functools import lru_cache
 from typing import Optional
 
+@lru_cache(maxsize=1)
+def _system_info() -> platform.uname_result:
+    """Look up OS name, release and architecture once per run"""
+    return platform.uname()
+
 class BotSetup:
     """Bot setup and installation manager"""
     
@@ -59,10 +67,11 @@ class BotSetup:
     
     def check_system(self) -> bool:
         """Check system compatibility"""
-        self.print_info(f"Operating System: {platform.system()} {platform.release()}")
-        self.print_info(f"Architecture: {platform.machine()}")
+        info = _system_info()
+        self.print_info(f"Operating System: {info.system} {info.release}")
+        self.print_info(f"Architecture: {info.machine}")
         
-        if platform.system() not in ["Linux", "Darwin", "Windows"]:
+        if info.system not in ("Linux", "Darwin", "Windows"):
             self.print_warning("This OS may not be fully supported")
         
         return True
@@ -77,11 +86,16 @@ class BotSetup:
         
         try:
             self.print_info("Installing packages from requirements.txt...")
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
+            started = time.monotonic()
+            # Prefer wheels over building sdists, and skip pip's self-update check
+            subprocess.run([
+                sys.executable, "-m", "pip", "install",
+                "--disable-pip-version-check", "--no-input", "--prefer-binary",
                 "-r", str(self.requirements_file)
-            ])
-            self.print_success("Dependencies installed successfully")
+            ], check=True)
+            self.print_success(
+                f"Dependencies installed successfully in {time.monotonic() - started:.1f}s"
+            )
             return True
         except subprocess.CalledProcessError as e:
             self.print_error(f"Failed to install dependencies: {e}")
@@ -249,21 +263,13 @@ ENABLE_PREMIUM={str(config.get('ENABLE_PREMIUM', False))}
         if not all_exist:
             return False
         
-        # Check Python packages
+        # Check Python packages; find_spec locates them without running their imports
         self.print_info("Checking Python packages...")
-        try:
-            import telegram
-            self.print_success("python-telegram-bot is installed")
-        except ImportError:
-            self.print_error("python-telegram-bot is not installed")
-            return False
-        
-        try:
-            import requests
-            self.print_success("requests is installed")
-        except ImportError:
-            self.print_error("requests is not installed")
-            return False
+        for module, package in (("telegram", "python-telegram-bot"), ("requests", "requests")):
+            if find_spec(module) is None:
+                self.print_error(f"{package} is not installed")
+                return False
+            self.print_success(f"{package} is installed")
         
         return True
     
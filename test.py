@@ -10,8 +10,13 @@ Version: 2.0
 import unittest
 import sys
 import os
+import io
+import time
 import json
 import tempfile
+import threading
+import weakref
+import gc
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
 
@@ -20,9 +25,10 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from utils import (
     LRUCache, Validator, Formatter, SecurityUtils, 
-    JSONUtils, Statistics, FileUtils
+    JSONUtils, Statistics, FileUtils, async_task
 )
 from config import Config, validate_config
+import utils
 
 class TestLRUCache(unittest.TestCase):
     """Test LRU Cache implementation"""
@@ -51,6 +57,48 @@ class TestLRUCache(unittest.TestCase):
         self.cache.set("key1", "value1")
         self.cache.clear()
         self.assertEqual(self.cache.size(), 0)
+    
+    def test_pop(self):
+        """Test removing a key"""
+        self.cache.set("key1", "value1")
+        self.assertEqual(self.cache.pop("key1"), "value1")
+        self.assertIsNone(self.cache.get("key1"))
+        self.assertEqual(self.cache.pop("key1", "missing"), "missing")
+    
+    def test_reap_expired(self):
+        """Test sweeping expired entries"""
+        cache = LRUCache(max_size=3, expiry_time=0)
+        cache.set("key1", "value1")
+        time.sleep(0.01)
+        self.assertEqual(cache.reap_expired(), 1)
+        self.assertEqual(cache.size(), 0)
+    
+    def test_collected_cache_leaves_reaper(self):
+        """Test that one shared reaper serves every cache and forgets collected ones"""
+        caches = [LRUCache(max_size=3, expiry_time=10) for _ in range(5)]
+        reapers = [t for t in threading.enumerate() if t.name == "lru-reaper"]
+        self.assertEqual(len(reapers), 1)
+        
+        ref = weakref.ref(caches[0])
+        registered = len(utils._lru_caches)
+        del caches
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(len(utils._lru_caches), registered - 5)
+
+class TestAsyncTask(unittest.TestCase):
+    """Test background task decorator"""
+    
+    def test_returns_future(self):
+        """Test that async_task returns a Future carrying the result"""
+        @async_task
+        def add(a, b):
+            return a + b
+        
+        future = add(2, 3)
+        self.assertEqual(future.result(timeout=5), 5)
+        self.assertTrue(future.done())
+        self.assertFalse(hasattr(future, 'join'))
 
 class TestValidator(unittest.TestCase):
     """Test input validation"""
@@ -130,6 +178,8 @@ class TestFormatter(unittest.TestCase):
         self.assertEqual(Formatter.format_duration(30), "30s")
         self.assertEqual(Formatter.format_duration(90), "1m 30s")
         self.assertEqual(Formatter.format_duration(3600), "1h 0m")
+        self.assertEqual(Formatter.format_duration(-5), "-5s")
+        self.assertEqual(Formatter.format_duration(-3700), "-3700s")
     
     def test_format_percentage(self):
         """Test percentage formatting"""
@@ -200,13 +250,23 @@ class TestJSONUtils(unittest.TestCase):
         
         try:
             data = {"key": "value", "number": 42}
-            JSONUtils.save_json(data, temp_file)
+            self.assertTrue(JSONUtils.save_json(data, temp_file))
             loaded_data = JSONUtils.load_json(temp_file)
             self.assertEqual(loaded_data, data)
         finally:
             if os.path.exists(temp_file):
                 os.remove(temp_file)
     
+    def test_save_and_load_json_stream(self):
+        """Test JSON save and load through an open stream"""
+        buffer = io.StringIO()
+        data = {"key": "value", "number": 42}
+        self.assertTrue(JSONUtils.save_json(data, buffer))
+        
+        buffer.seek(0)
+        loaded_data = JSONUtils.load_json(buffer)
+        self.assertEqual(loaded_data, data)
+    
     def test_merge_json(self):
         """Test JSON merging"""
         dict1 = {"a": 1, "b": 2}
@@ -239,6 +299,21 @@ class TestFileUtils(unittest.TestCase):
             if os.path.exists(temp_file):
                 os.remove(temp_file)
     
+    def test_file_size_sees_outside_writes(self):
+        """Test that repeated size lookups are not served stale"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+            temp_file = f.name
+        
+        try:
+            FileUtils.write_file(temp_file, "a")
+            self.assertEqual(FileUtils.get_file_size(temp_file), 1)
+            with open(temp_file, 'a') as f:
+                f.write("bcde")
+            self.assertEqual(FileUtils.get_file_size(temp_file), 5)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    
     def test_create_directory(self):
         """Test directory creation"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -301,20 +376,8 @@ class TestIntegration(unittest.TestCase):
 
 def run_tests():
     """Run all tests"""
-    # Create test suite
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Add test classes
-    suite.addTests(loader.loadTestsFromTestCase(TestLRUCache))
-    suite.addTests(loader.loadTestsFromTestCase(TestValidator))
-    suite.addTests(loader.loadTestsFromTestCase(TestFormatter))
-    suite.addTests(loader.loadTestsFromTestCase(TestSecurityUtils))
-    suite.addTests(loader.loadTestsFromTestCase(TestStatistics))
-    suite.addTests(loader.loadTestsFromTestCase(TestJSONUtils))
-    suite.addTests(loader.loadTestsFromTestCase(TestFileUtils))
-    suite.addTests(loader.loadTestsFromTestCase(TestConfiguration))
-    suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
+    # Collect every TestCase in this module
+    suite = unittest.defaultTestLoader.loadTestsFromModule(sys.modules[__name__])
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -15,21 +15,77 @@ import hashlib
 import logging
 import threading
 import secrets
+import random
+import statistics
+import stat
+from concurrent.futures import ThreadPoolExecutor, Future
+import weakref
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable, Tuple
-from functools import wraps, lru_cache
-from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union, IO, Iterable
+from functools import wraps, lru_cache, partial
+from collections import OrderedDict, deque
 import pickle
 import base64
 import re
 from urllib.parse import urlparse, parse_qs, quote, unquote
 
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
 # CACHING SYSTEM
 # ============================================================================
 
+# LRUCache splits into up to this many stripes, keeping at least this many entries in each
+LRU_MAX_SHARDS = 16
+LRU_MIN_SHARD_SIZE = 64
+# The shared reaper wakes this often to sweep whichever caches are due
+LRU_REAP_TICK = 1.0
+
+# Live caches, held weakly so the reaper never keeps one alive
+_lru_caches: "weakref.WeakSet[LRUCache]" = weakref.WeakSet()
+_lru_reaper_lock = threading.Lock()
+_lru_reaper: Optional[threading.Thread] = None
+
+def _register_lru_cache(cache: "LRUCache"):
+    """Add a cache to the shared reaper, starting its thread on first use"""
+    global _lru_reaper
+    with _lru_reaper_lock:
+        _lru_caches.add(cache)
+        if _lru_reaper is None or not _lru_reaper.is_alive():
+            _lru_reaper = threading.Thread(target=_lru_reap_loop, name="lru-reaper", daemon=True)
+            _lru_reaper.start()
+
+def _lru_reap_loop():
+    """Sweep each cache on its own schedule, backing off while sweeps find nothing"""
+    while True:
+        time.sleep(LRU_REAP_TICK)
+        with _lru_reaper_lock:
+            caches = list(_lru_caches)
+        now = time.monotonic()
+        for cache in caches:
+            if now < cache._next_reap:
+                continue
+            try:
+                evicted = cache.reap_expired()
+            except Exception as e:
+                logger.error(f"Error reaping cache: {e}")
+                evicted = 0
+            base = cache._reap_base_interval
+            cache._reap_interval = base if evicted else min(cache._reap_interval * 2, base * 16)
+            cache._next_reap = now + cache._reap_interval
+        # Drop strong references before sleeping so collected caches leave the set
+        caches = cache = None
+
 class LRUCache:
     """Thread-safe LRU (Least Recently Used) cache implementation"""
     
@@ -43,50 +99,87 @@ class LRUCache:
         """
         self.max_size = max_size
         self.expiry_time = expiry_time
-        self.cache: OrderedDict = OrderedDict()
-        self.timestamps: Dict = {}
-        self.lock = threading.Lock()
+        
+        # Independent stripes, each with its own lock, so operations on
+        # different keys do not contend; eviction is LRU within a stripe.
+        # Small caches keep a single stripe and therefore exact LRU order.
+        shards = 1
+        while shards < LRU_MAX_SHARDS and max_size // (shards * 2) >= LRU_MIN_SHARD_SIZE:
+            shards *= 2
+        self._shard_mask = shards - 1
+        self._shard_size = max_size // shards
+        # Each stripe maps key -> (value, monotonic expiry)
+        self._shards: List[Tuple[threading.Lock, OrderedDict]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+        # Swept by the shared reaper every expiry_time/4, backing off to 16x when idle
+        self._reap_base_interval = max(self.expiry_time / 4, 1)
+        self._reap_interval = self._reap_base_interval
+        self._next_reap = time.monotonic() + self._reap_interval
+        _register_lru_cache(self)
+    
+    def _shard(self, key: str) -> Tuple[threading.Lock, OrderedDict]:
+        """Get the stripe that owns a key"""
+        return self._shards[hash(key) & self._shard_mask]
+    
+    def reap_expired(self) -> int:
+        """Remove every expired entry; returns how many were removed"""
+        now = time.monotonic()
+        removed = 0
+        for lock, entries in self._shards:
+            with lock:
+                expired = [key for key, (_, expires_at) in entries.items() if now > expires_at]
+                for key in expired:
+                    del entries[key]
+            removed += len(expired)
+        return removed
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        with self.lock:
-            if key not in self.cache:
+        lock, entries = self._shard(key)
+        with lock:
+            entry = entries.get(key)
+            if entry is None:
                 return None
             
             # Check if expired
-            if time.time() - self.timestamps[key] > self.expiry_time:
-                del self.cache[key]
-                del self.timestamps[key]
+            if time.monotonic() > entry[1]:
+                del entries[key]
                 return None
             
             # Move to end (most recently used)
-            self.cache.move_to_end(key)
-            return self.cache[key]
+            entries.move_to_end(key)
+            return entry[0]
     
     def set(self, key: str, value: Any):
         """Set value in cache"""
-        with self.lock:
-            if key in self.cache:
-                self.cache.move_to_end(key)
-            
-            self.cache[key] = value
-            self.timestamps[key] = time.time()
+        lock, entries = self._shard(key)
+        with lock:
+            entries[key] = (value, time.monotonic() + self.expiry_time)
+            entries.move_to_end(key)
             
-            # Remove oldest if cache is full
-            if len(self.cache) > self.max_size:
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
-                del self.timestamps[oldest_key]
+            # Remove oldest if this stripe is full
+            if len(entries) > self._shard_size:
+                entries.popitem(last=False)
+    
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove a key and return its value, or default if missing or expired"""
+        lock, entries = self._shard(key)
+        with lock:
+            entry = entries.pop(key, None)
+        if entry is None or time.monotonic() > entry[1]:
+            return default
+        return entry[0]
     
     def clear(self):
         """Clear entire cache"""
-        with self.lock:
-            self.cache.clear()
-            self.timestamps.clear()
+        for lock, entries in self._shards:
+            with lock:
+                entries.clear()
     
     def size(self) -> int:
         """Get current cache size"""
-        return len(self.cache)
+        return sum(len(entries) for _, entries in self._shards)
 
 # ============================================================================
 # DECORATORS
@@ -113,11 +206,13 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
                 except Exception as e:
                     last_exception = e
                     if attempt < max_retries:
-                        logger.warning(
-                            f"Attempt {attempt + 1} failed for {func.__name__}: {e}. "
-                            f"Retrying in {current_delay}s..."
-                        )
-                        time.sleep(current_delay)
+                        if logger.isEnabledFor(logging.WARNING):
+                            logger.warning(
+                                "Attempt %d failed for %s: %s. Retrying in %ss...",
+                                attempt + 1, func.__name__, e, current_delay
+                            )
+                        # Up to 10% jitter so concurrent callers don't retry in lockstep
+                        time.sleep(current_delay + random.uniform(0, current_delay * 0.1))
                         current_delay *= backoff
                     else:
                         logger.error(f"All {max_retries + 1} attempts failed for {func.__name__}")
@@ -136,22 +231,27 @@ def rate_limit(calls: int = 10, period: float = 60.0):
         period: Time period in seconds
     """
     def decorator(func: Callable) -> Callable:
-        call_times = []
+        # Monotonic call times, oldest on the left
+        call_times: deque = deque()
         lock = threading.Lock()
         
         @wraps(func)
         def wrapper(*args, **kwargs):
             with lock:
-                now = time.time()
+                now = time.monotonic()
                 
-                # Remove old calls outside the period
-                call_times[:] = [t for t in call_times if now - t < period]
+                # Remove old calls outside the period; only expired entries are touched
+                while call_times and now - call_times[0] >= period:
+                    call_times.popleft()
                 
                 if len(call_times) >= calls:
                     sleep_time = period - (now - call_times[0])
                     if sleep_time > 0:
                         logger.warning(f"Rate limit reached for {func.__name__}. Sleeping {sleep_time}s")
                         time.sleep(sleep_time)
+                    # The oldest call has now left the window
+                    call_times.popleft()
+                    now = time.monotonic()
                 
                 call_times.append(now)
             
@@ -160,38 +260,67 @@ def rate_limit(calls: int = 10, period: float = 60.0):
         return wrapper
     return decorator
 
+# Shared by every async_task call so worker threads are reused and bounded
+ASYNC_TASK_WORKERS = (os.cpu_count() or 1) * 4
+_async_pool: Optional[ThreadPoolExecutor] = None
+_async_pool_lock = threading.Lock()
+
+def _get_async_pool() -> ThreadPoolExecutor:
+    """Create the shared async_task pool on first use"""
+    global _async_pool
+    if _async_pool is None:
+        with _async_pool_lock:
+            if _async_pool is None:
+                _async_pool = ThreadPoolExecutor(
+                    max_workers=ASYNC_TASK_WORKERS, thread_name_prefix='async_task'
+                )
+    return _async_pool
+
+def _log_task_failure(future: Future):
+    """Log exceptions from fire-and-forget tasks that nobody waits on"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Async task failed: {future.exception()}")
+
 def async_task(func: Callable) -> Callable:
-    """Decorator to run function asynchronously"""
+    """Decorator to run function asynchronously; returns a Future"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        thread = threading.Thread(target=func, args=args, kwargs=kwargs, daemon=True)
-        thread.start()
-        return thread
+        future = _get_async_pool().submit(func, *args, **kwargs)
+        future.add_done_callback(_log_task_failure)
+        return future
     
     return wrapper
 
-def timed_cache(seconds: int = 300):
-    """Decorator for time-based caching"""
+def timed_cache(seconds: int = 300, max_size: int = 1024):
+    """Decorator for time-based caching, keeping at most max_size results"""
     def decorator(func: Callable) -> Callable:
-        cache = {}
-        cache_times = {}
+        # key -> (result, monotonic expiry), oldest insertion first
+        cache: OrderedDict = OrderedDict()
         lock = threading.Lock()
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            key = str(args) + str(kwargs)
+            # Hashable tuple key: no string formatting, and keyword order does not matter
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else (args, ())
+            
+            try:
+                entry = cache.get(key)
+            except TypeError:
+                # Unhashable arguments cannot be cached
+                return func(*args, **kwargs)
             
+            if entry is not None and time.monotonic() < entry[1]:
+                return entry[0]
+            
+            # Computed outside the lock so slow calls for different keys run concurrently
+            result = func(*args, **kwargs)
             with lock:
-                now = time.time()
-                
-                if key in cache and now - cache_times[key] < seconds:
-                    return cache[key]
-                
-                result = func(*args, **kwargs)
-                cache[key] = result
-                cache_times[key] = now
-                
-                return result
+                cache[key] = (result, time.monotonic() + seconds)
+                cache.move_to_end(key)
+                if len(cache) > max_size:
+                    cache.popitem(last=False)
+            
+            return result
         
         return wrapper
     return decorator
@@ -200,55 +329,52 @@ def timed_cache(seconds: int = 300):
 # VALIDATION UTILITIES
 # ============================================================================
 
+# Compiled once at import; the video id form covers watch, short, embed and /v/ URLs
+_YOUTUBE_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com\/(?:watch\?v=|embed\/|v\/)|youtu\.be\/)([a-zA-Z0-9_-]{11})'
+)
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_RE = re.compile(r'^\+?1?\d{9,15}$')
+# A scheme followed by "://" and a non-empty authority, as urlparse would split them
+_URL_RE = re.compile(r'[A-Za-z][A-Za-z0-9+\-.]*://[^\s/?#]')
+# Deletes the characters sanitize_input strips
+_DANGEROUS_CHARS_TABLE = str.maketrans('', '', '<>"\'&')
+
 class Validator:
     """Input validation utilities"""
     
     @staticmethod
     def is_valid_youtube_url(url: str) -> bool:
         """Validate YouTube URL"""
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, url):
-                return True
-        
-        return False
+        return _YOUTUBE_VIDEO_ID_RE.search(url) is not None
     
     @staticmethod
     def extract_video_id(url: str) -> Optional[str]:
         """Extract video ID from YouTube URL"""
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        return None
+        match = _YOUTUBE_VIDEO_ID_RE.search(url)
+        return match.group(1) if match else None
+    
+    @staticmethod
+    def scan_urls(urls: List[str]) -> List[Optional[str]]:
+        """Extract video IDs from many URLs; None where a URL is not a YouTube link"""
+        search = _YOUTUBE_VIDEO_ID_RE.search
+        return [m.group(1) if m else None for m in map(search, urls)]
     
     @staticmethod
     def is_valid_email(email: str) -> bool:
         """Validate email address"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return _EMAIL_RE.match(email) is not None
     
     @staticmethod
     def is_valid_phone(phone: str) -> bool:
         """Validate phone number"""
-        pattern = r'^\+?1?\d{9,15}$'
-        return re.match(pattern, phone) is not None
+        return _PHONE_RE.match(phone) is not None
     
     @staticmethod
-    def is_valid_url(url: str) -> bool:
-        """Validate URL"""
+    def is_valid_url(url: str, strict: bool = False) -> bool:
+        """Validate URL; strict parses it fully with urlparse"""
+        if not strict:
+            return _URL_RE.match(url) is not None
         try:
             result = urlparse(url)
             return all([result.scheme, result.netloc])
@@ -261,21 +387,37 @@ class Validator:
         # Remove leading/trailing whitespace
         text = text.strip()
         
-        # Limit length
-        if len(text) > max_length:
-            text = text[:max_length]
-        
-        # Remove potentially dangerous characters
-        dangerous_chars = ['<', '>', '"', "'", '&']
-        for char in dangerous_chars:
-            text = text.replace(char, '')
-        
-        return text
+        # Limit length, then remove potentially dangerous characters in one pass
+        return text[:max_length].translate(_DANGEROUS_CHARS_TABLE)
 
 # ============================================================================
 # FORMATTING UTILITIES
 # ============================================================================
 
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Bars up to this width are sliced from prebuilt strings instead of repeated per call
+PROGRESS_BAR_MAX_WIDTH = 100
+_BAR_FULL = '█' * PROGRESS_BAR_MAX_WIDTH
+_BAR_EMPTY = '░' * PROGRESS_BAR_MAX_WIDTH
+
+@lru_cache(maxsize=256)
+def _render_progress_bar(current: int, total: int, width: int) -> str:
+    """Render a progress bar; polling loops redraw the same state many times"""
+    if total == 0:
+        percentage = 0
+        filled = 0
+    else:
+        percentage = (current / total) * 100
+        filled = max(0, min(width, int(width * current // total)))
+    
+    if width <= PROGRESS_BAR_MAX_WIDTH:
+        bar = _BAR_FULL[:filled] + _BAR_EMPTY[:width - filled]
+    else:
+        bar = '█' * filled + '░' * (width - filled)
+    
+    return f"[{bar}] {percentage:.0f}%"
+
 class Formatter:
     """Text formatting utilities"""
     
@@ -287,31 +429,33 @@ class Formatter:
     @staticmethod
     def format_bytes(bytes_size: int) -> str:
         """Format bytes to human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_size < 1024.0:
-                return f"{bytes_size:.2f} {unit}"
-            bytes_size /= 1024.0
-        
-        return f"{bytes_size:.2f} PB"
+        # Each unit is 10 more bits, so the bit length picks the unit directly
+        if bytes_size < 1024:
+            index = 0
+        else:
+            index = min((int(bytes_size).bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+        return f"{bytes_size / (1 << (index * 10)):.2f} {_BYTE_UNITS[index]}"
     
     @staticmethod
     def format_duration(seconds: int) -> str:
         """Format duration to human-readable format"""
+        # Short and negative durations stay in plain seconds
         if seconds < 60:
             return f"{seconds}s"
-        elif seconds < 3600:
-            minutes = seconds // 60
-            secs = seconds % 60
-            return f"{minutes}m {secs}s"
-        else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
+        hours, rem = divmod(seconds, 3600)
+        minutes, secs = divmod(rem, 60)
+        if hours:
             return f"{hours}h {minutes}m"
+        return f"{minutes}m {secs}s"
     
     @staticmethod
     def format_datetime(dt: datetime) -> str:
         """Format datetime to readable string"""
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        # Plain integer formatting; strftime goes through the C locale machinery
+        return (
+            f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+            f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+        )
     
     @staticmethod
     def format_percentage(value: float, total: float) -> str:
@@ -332,34 +476,34 @@ class Formatter:
     @staticmethod
     def create_progress_bar(current: int, total: int, width: int = 20) -> str:
         """Create ASCII progress bar"""
-        if total == 0:
-            percentage = 0
-        else:
-            percentage = (current / total) * 100
-        
-        filled = int(width * current // total)
-        bar = '█' * filled + '░' * (width - filled)
-        
-        return f"[{bar}] {percentage:.0f}%"
+        return _render_progress_bar(current, total, width)
 
 # ============================================================================
 # SECURITY UTILITIES
 # ============================================================================
 
+# One dict lookup per hash instead of an if/elif chain. md5 is only ever a
+# fingerprint here, so it is allowed on FIPS-restricted OpenSSL builds too.
+_HASHERS: Dict[str, Callable] = {
+    'sha256': hashlib.sha256,
+    'sha512': hashlib.sha512,
+    'md5': partial(hashlib.md5, usedforsecurity=False),
+    'blake2b': hashlib.blake2b,
+}
+if blake3 is not None:
+    # SIMD-accelerated; suited to cache keys and dedupe fingerprints
+    _HASHERS['blake3'] = blake3
+
 class SecurityUtils:
     """Security and encryption utilities"""
     
     @staticmethod
     def hash_string(text: str, algorithm: str = 'sha256') -> str:
-        """Hash string using specified algorithm"""
-        if algorithm == 'sha256':
-            return hashlib.sha256(text.encode()).hexdigest()
-        elif algorithm == 'sha512':
-            return hashlib.sha512(text.encode()).hexdigest()
-        elif algorithm == 'md5':
-            return hashlib.md5(text.encode()).hexdigest()
-        else:
+        """Hash string using specified algorithm ('blake3' needs the blake3 package)"""
+        hasher = _HASHERS.get(algorithm)
+        if hasher is None:
             raise ValueError(f"Unknown algorithm: {algorithm}")
+        return hasher(text.encode()).hexdigest()
     
     @staticmethod
     def encode_base64(text: str) -> str:
@@ -377,9 +521,14 @@ class SecurityUtils:
     
     @staticmethod
     def generate_token(length: int = 32) -> str:
-        """Generate random token"""
+        """Generate random hex token"""
         return secrets.token_hex(length // 2)
     
+    @staticmethod
+    def generate_urlsafe_token(nbytes: int = 32) -> str:
+        """Generate random URL-safe token; shorter than hex for the same entropy"""
+        return secrets.token_urlsafe(nbytes)
+    
     @staticmethod
     def mask_sensitive_data(data: str, visible_chars: int = 4) -> str:
         """Mask sensitive data"""
@@ -394,25 +543,47 @@ class SecurityUtils:
 # JSON UTILITIES
 # ============================================================================
 
+def _dumps_json(data: Any) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        # Non-string keys are stringified, as json.dumps does
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode()
+
+# Accepts str or bytes, like json.loads
+_loads_json = orjson.loads if orjson is not None else json.loads
+
+@lru_cache(maxsize=1024)
+def _split_key_path(key_path: str) -> Tuple[str, ...]:
+    """Split a dotted key path once; hot config lookups reuse the same few paths"""
+    return tuple(key_path.split('.'))
+
 class JSONUtils:
     """JSON handling utilities"""
     
     @staticmethod
-    def load_json(file_path: str) -> Optional[Dict]:
-        """Load JSON from file"""
+    def load_json(file_path: Union[str, IO[str]]) -> Optional[Dict]:
+        """Load JSON from a file path or an open text stream"""
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            if hasattr(file_path, 'read'):
+                return _loads_json(file_path.read())
+            # Binary read: orjson parses the UTF-8 bytes without a text decode
+            with open(file_path, 'rb') as f:
+                return _loads_json(f.read())
         except Exception as e:
             logger.error(f"Error loading JSON from {file_path}: {e}")
             return None
     
     @staticmethod
-    def save_json(data: Dict, file_path: str) -> bool:
-        """Save JSON to file"""
+    def save_json(data: Dict, file_path: Union[str, IO[str]]) -> bool:
+        """Save JSON to a file path or an open text stream"""
         try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            payload = _dumps_json(data)
+            if hasattr(file_path, 'write'):
+                file_path.write(payload.decode())
+                return True
+            with open(file_path, 'wb') as f:
+                f.write(payload)
             return True
         except Exception as e:
             logger.error(f"Error saving JSON to {file_path}: {e}")
@@ -428,10 +599,9 @@ class JSONUtils:
     @staticmethod
     def get_nested_value(data: Dict, key_path: str, default: Any = None) -> Any:
         """Get nested value from dictionary using dot notation"""
-        keys = key_path.split('.')
         value = data
         
-        for key in keys:
+        for key in _split_key_path(key_path):
             if isinstance(value, dict) and key in value:
                 value = value[key]
             else:
@@ -451,21 +621,15 @@ class Statistics:
         """Calculate average of values"""
         if not values:
             return 0
-        return sum(values) / len(values)
+        # One C-level fsum pass, with exactly rounded accumulation
+        return statistics.fmean(values)
     
     @staticmethod
     def calculate_median(values: List[float]) -> float:
         """Calculate median of values"""
         if not values:
             return 0
-        
-        sorted_values = sorted(values)
-        n = len(sorted_values)
-        
-        if n % 2 == 0:
-            return (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
-        else:
-            return sorted_values[n // 2]
+        return statistics.median(values)
     
     @staticmethod
     def calculate_std_dev(values: List[float]) -> float:
@@ -473,9 +637,16 @@ class Statistics:
         if not values:
             return 0
         
-        mean = Statistics.calculate_average(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        return variance ** 0.5
+        # Welford's update: one numerically stable pass instead of mean-then-deviations
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        for x in values:
+            n += 1
+            delta = x - mean
+            mean += delta / n
+            m2 += delta * (x - mean)
+        return (m2 / n) ** 0.5
     
     @staticmethod
     def calculate_percentile(values: List[float], percentile: float) -> float:
@@ -495,19 +666,52 @@ class Statistics:
 # FILE UTILITIES
 # ============================================================================
 
+# get_file_size reuses the stat taken by a file_exists call on the same path
+# and thread within this many seconds, once; every other lookup stats afresh
+FILE_STAT_TTL = 1.0
+
+# Per-thread (path, stat result, monotonic expiry) left by file_exists
+_last_stat = threading.local()
+
 class FileUtils:
     """File handling utilities"""
     
+    @staticmethod
+    def _take_stat(file_path: str) -> Optional[os.stat_result]:
+        """Consume the stat file_exists left for this path, if it is still fresh"""
+        entry = getattr(_last_stat, 'entry', None)
+        _last_stat.entry = None
+        if entry is not None and entry[0] == file_path and time.monotonic() < entry[2]:
+            return entry[1]
+        return None
+    
+    @staticmethod
+    def _invalidate_stat(file_path: str):
+        """Forget a path's remembered stat after changing the file"""
+        entry = getattr(_last_stat, 'entry', None)
+        if entry is not None and entry[0] == file_path:
+            _last_stat.entry = None
+    
     @staticmethod
     def file_exists(file_path: str) -> bool:
         """Check if file exists"""
-        return os.path.isfile(file_path)
+        try:
+            result = os.stat(file_path)
+        except OSError:
+            _last_stat.entry = None
+            return False
+        # An existence check is usually followed by a size lookup
+        _last_stat.entry = (file_path, result, time.monotonic() + FILE_STAT_TTL)
+        return stat.S_ISREG(result.st_mode)
     
     @staticmethod
     def get_file_size(file_path: str) -> int:
         """Get file size in bytes"""
+        result = FileUtils._take_stat(file_path)
+        if result is not None:
+            return result.st_size
         try:
-            return os.path.getsize(file_path)
+            return os.stat(file_path).st_size
         except Exception as e:
             logger.error(f"Error getting file size: {e}")
             return 0
@@ -528,6 +732,7 @@ class FileUtils:
         try:
             with open(file_path, 'w') as f:
                 f.write(content)
+            FileUtils._invalidate_stat(file_path)
             return True
         except Exception as e:
             logger.error(f"Error writing file: {e}")
@@ -539,6 +744,20 @@ class FileUtils:
         try:
             with open(file_path, 'a') as f:
                 f.write(content)
+            FileUtils._invalidate_stat(file_path)
+            return True
+        except Exception as e:
+            logger.error(f"Error appending to file: {e}")
+            return False
+    
+    @staticmethod
+    def append_lines(file_path: str, lines: Iterable[str]) -> bool:
+        """Append many strings with a single open and write; prefer this for bursts"""
+        try:
+            data = ''.join(lines)
+            with open(file_path, 'a') as f:
+                f.write(data)
+            FileUtils._invalidate_stat(file_path)
             return True
         except Exception as e:
             logger.error(f"Error appending to file: {e}")
@@ -550,6 +769,7 @@ class FileUtils:
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
+            FileUtils._invalidate_stat(file_path)
             return True
         except Exception as e:
             logger.error(f"Error deleting file: {e}")